@@ -5,6 +5,39 @@
 
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+# Корректные префиксы имен моделей (кортеж - проверка одним вызовом str.startswith)
+CORRECT_PREFIXES = ('model_',)
+
+
+def remove_files(models_dir, file_paths):
+    """
+    Параллельное удаление файлов из папки models
+
+    Где поддерживается (Linux/macOS), имена разрешаются относительно открытого
+    дескриптора папки через dir_fd. Возвращает список пар (путь, ошибка или None).
+    """
+    dir_fd = None
+    if os.unlink in os.supports_dir_fd and hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(models_dir, os.O_RDONLY | os.O_DIRECTORY)
+
+    def remove(file_path):
+        try:
+            if dir_fd is not None:
+                os.unlink(os.path.basename(file_path), dir_fd=dir_fd)
+            else:
+                os.remove(file_path)
+            return file_path, None
+        except Exception as e:
+            return file_path, e
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(32, len(file_paths))) as executor:
+            return list(executor.map(remove, file_paths))
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
 
 
 def clean_models_directory():
@@ -15,44 +48,50 @@ def clean_models_directory():
         print("✅ Папка models не существует")
         return
 
-    # Список корректных префиксов
-    correct_prefixes = ['model_']
-
     # Файлы для удаления
     files_to_remove = []
 
-    for file in os.listdir(models_dir):
-        file_path = os.path.join(models_dir, file)
+    with os.scandir(models_dir) as entries:
+        for entry in entries:
+            file = entry.name
+
+            # Проверяем формат имени файла
+            if not file.endswith('.pkl'):
+                continue
 
-        # Проверяем формат имени файла
-        if file.endswith('.pkl'):
-            if not any(file.startswith(prefix) for prefix in correct_prefixes):
-                files_to_remove.append(file_path)
-                print(f"🗑️ Файл для удаления (неправильный формат): {file}")
+            if not file.startswith(CORRECT_PREFIXES):
+                if entry.is_file(follow_symlinks=False):
+                    files_to_remove.append(entry.path)
+                    print(f"🗑️ Файл для удаления (неправильный формат): {file}")
             elif file == "model - scaler.pkl":  # Специфичный некорректный файл
-                files_to_remove.append(file_path)
+                files_to_remove.append(entry.path)
                 print(f"🗑️ Файл для удаления (некорректное имя): {file}")
 
     # Удаляем файлы
+    removed = set()
     if files_to_remove:
         confirm = input(f"Удалить {len(files_to_remove)} файлов? (y/n): ")
         if confirm.lower() == 'y':
-            for file_path in files_to_remove:
-                try:
-                    os.remove(file_path)
+            for file_path, error in remove_files(models_dir, files_to_remove):
+                if error is None:
+                    removed.add(file_path)
                     print(f"✅ Удален: {os.path.basename(file_path)}")
-                except Exception as e:
-                    print(f"❌ Ошибка удаления {file_path}: {e}")
+                else:
+                    print(f"❌ Ошибка удаления {file_path}: {error}")
         else:
             print("❌ Удаление отменено")
     else:
         print("✅ Нет файлов для удаления")
 
-    # Показываем оставшиеся файлы
-    remaining_files = [f for f in os.listdir(models_dir) if f.endswith('.pkl')]
-    print(f"\n📁 Оставшиеся файлы в models: {len(remaining_files)}")
-    for file in remaining_files:
-        print(f"   📄 {file}")
+    # Показываем оставшиеся файлы по мере обхода папки
+    print("\n📁 Оставшиеся файлы в models:")
+    remaining_count = 0
+    with os.scandir(models_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.pkl') and entry.path not in removed:
+                remaining_count += 1
+                print(f"   📄 {entry.name}")
+    print(f"📁 Всего оставшихся файлов: {remaining_count}")
 
 
 if __name__ == "__main__":
@@ -3,9 +3,12 @@
 Диагностика проблем с торговлей в AI Trading Robot
 """
 
+import argparse
 import sys
 import os
+import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Добавляем путь к src
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -13,101 +16,183 @@ src_path = os.path.join(current_dir, 'src')
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
-from core.mt5_client import initialize_mt5, get_symbol_info, check_trading_allowed, place_order_simple, \
-    place_order_with_sltp
+from core.mt5_client import initialize_mt5, get_symbol_info_cached, place_order_simple, place_order_with_sltp, \
+    close_all_orders, call_limited
 import MetaTrader5 as mt5
 
+# Кэш результатов успешных проверок между запусками диагностики
+DIAG_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.ai_trader_mt5', 'diag_cache.json')
 
-def diagnose_account():
+
+def collect_terminal_state():
+    """
+    Параллельный запрос версии, информации о терминале и счете
+
+    Вызовы независимы друг от друга, поэтому выполняются одновременно.
+    Возвращает кортеж (version, terminal_info, account_info).
+    """
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        version, terminal_info, account_info = executor.map(
+            lambda call: call(), (mt5.version, mt5.terminal_info, mt5.account_info)
+        )
+    return version, terminal_info, account_info
+
+
+def write_lines(lines):
+    """
+    Вывод накопленных строк отчета одной операцией записи
+    """
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
+
+
+def load_diag_cache():
+    """
+    Загрузка кэша диагностики (пустой словарь, если файла нет или он поврежден)
+    """
+    try:
+        with open(DIAG_CACHE_PATH, 'r', encoding='utf-8') as file:
+            cache = json.load(file)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_diag_cache(cache):
+    """
+    Сохранение кэша диагностики
+    """
+    try:
+        os.makedirs(os.path.dirname(DIAG_CACHE_PATH), exist_ok=True)
+        with open(DIAG_CACHE_PATH, 'w', encoding='utf-8') as file:
+            json.dump(cache, file, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"⚠️ Не удалось сохранить кэш диагностики: {e}")
+
+
+def is_section_fresh(cache, key, max_age):
+    """
+    Проверка, что успешный результат раздела моложе max_age секунд
+    """
+    entry = cache.get(key)
+    return bool(entry) and time.time() - entry.get('ts', 0) < max_age
+
+
+def run_section(cache, key, max_age, section, *args):
+    """
+    Выполнение раздела диагностики с использованием кэша
+
+    Свежий результат выводится из кэша без обращений к MT5, успешный новый
+    результат сохраняется в кэш.
+    """
+    if is_section_fresh(cache, key, max_age):
+        age = int(time.time() - cache[key]['ts'])
+        write_lines(cache[key]['lines'] + [f"♻️ Результат из кэша ({age} с назад, --force для перепроверки)"])
+        return True
+
+    ok, lines = section(*args)
+    write_lines(lines)
+
+    if ok:
+        cache[key] = {'ts': time.time(), 'lines': lines}
+        save_diag_cache(cache)
+
+    return ok
+
+
+def diagnose_account(account_info):
     """
     Диагностика счета и подключения
+
+    Возвращает (успех, строки отчета)
     """
-    print("🔍 Диагностика счета MT5")
-    print("=" * 50)
+    lines = ["\n🔍 Диагностика счета MT5", "=" * 50]
 
-    if not initialize_mt5():
-        print("❌ Не удалось инициализировать MT5")
-        return False
+    if not account_info:
+        lines.append("❌ Не удалось получить информацию о счете")
+        return False, lines
 
-    # Получаем информацию о счете
-    account_info = mt5.account_info()
-    if account_info:
-        print(f"✅ Информация о счете:")
-        print(f"   👤 Логин: {account_info.login}")
-        print(f"   💰 Баланс: {account_info.balance:.2f}")
-        print(f"   💵 Валюта: {account_info.currency}")
-        print(f"   🏦 Компания: {account_info.company}")
-        print(f"   🔧 Режим: {'Демо' if account_info.trade_mode == 1 else 'Реальный'}")
-        print(f"   📈 Кредитное плечо: 1:{account_info.leverage}")
-        print(f"   📊 Свободная маржа: {account_info.margin_free:.2f}")
-    else:
-        print("❌ Не удалось получить информацию о счете")
-        return False
+    lines += [
+        f"✅ Информация о счете:",
+        f"   👤 Логин: {account_info.login}",
+        f"   💰 Баланс: {account_info.balance:.2f}",
+        f"   💵 Валюта: {account_info.currency}",
+        f"   🏦 Компания: {account_info.company}",
+        f"   🔧 Режим: {'Демо' if account_info.trade_mode == 1 else 'Реальный'}",
+        f"   📈 Кредитное плечо: 1:{account_info.leverage}",
+        f"   📊 Свободная маржа: {account_info.margin_free:.2f}",
+    ]
 
-    return True
+    return True, lines
 
 
 def diagnose_symbol(symbol):
     """
     Диагностика символа
+
+    Возвращает (успех, строки отчета)
     """
-    print(f"\n🔍 Диагностика символа: {symbol}")
-    print("=" * 50)
+    lines = [f"\n🔍 Диагностика символа: {symbol}", "=" * 50]
 
-    symbol_info = get_symbol_info(symbol)
+    symbol_info = get_symbol_info_cached(symbol)
     if not symbol_info:
-        print(f"❌ Символ {symbol} не найден")
-        return False
-
-    print(f"✅ Информация о символе:")
-    print(f"   📛 Название: {symbol_info['name']}")
-    print(f"   💰 Bid: {symbol_info['bid']:.5f}")
-    print(f"   💵 Ask: {symbol_info['ask']:.5f}")
-    print(f"   📏 Спред: {symbol_info['spread']:.5f}")
-    print(f"   🔢 Digits: {symbol_info['digits']}")
-    print(f"   📍 Point: {symbol_info['point']}")
-    print(f"   🛑 Stops Level: {symbol_info['trade_stops_level']}")
-    print(f"   📦 Contract Size: {symbol_info['trade_contract_size']}")
-    print(f"   💱 Базовая валюта: {symbol_info['currency_base']}")
-    print(f"   💵 Валюта прибыли: {symbol_info['currency_profit']}")
-    print(f"   🏦 Валюта маржи: {symbol_info['currency_margin']}")
-    print(f"   ✅ Торговля разрешена: {symbol_info['trade_allowed']}")
-
-    # Проверяем торговые разрешения
-    trading_allowed = check_trading_allowed(symbol)
-    if not trading_allowed:
-        print(f"❌ Торговля запрещена для {symbol}")
-        return False
-
-    return True
+        lines.append(f"❌ Символ {symbol} не найден")
+        return False, lines
+
+    lines += [
+        f"✅ Информация о символе:",
+        f"   📛 Название: {symbol_info['name']}",
+        f"   💰 Bid: {symbol_info['bid']:.5f}",
+        f"   💵 Ask: {symbol_info['ask']:.5f}",
+        f"   📏 Спред: {symbol_info['spread']:.5f}",
+        f"   🔢 Digits: {symbol_info['digits']}",
+        f"   📍 Point: {symbol_info['point']}",
+        f"   🛑 Stops Level: {symbol_info['trade_stops_level']}",
+        f"   📦 Contract Size: {symbol_info['trade_contract_size']}",
+        f"   💱 Базовая валюта: {symbol_info['currency_base']}",
+        f"   💵 Валюта прибыли: {symbol_info['currency_profit']}",
+        f"   🏦 Валюта маржи: {symbol_info['currency_margin']}",
+        f"   ✅ Торговля разрешена: {symbol_info['trade_allowed']}",
+    ]
+
+    # Проверяем торговые разрешения (без повторного запроса к MT5)
+    if not symbol_info['trade_allowed']:
+        lines.append(f"❌ Торговля запрещена для {symbol}")
+        return False, lines
+
+    return True, lines
 
 
 def test_simple_orders(symbol):
     """
     Тестирование простых ордеров без SL/TP
     """
-    print(f"\n🧪 Тестирование простых ордеров для {symbol}")
-    print("=" * 50)
-
-    # Тест 1: BUY ордер
-    print(f"\n🔹 Тест 1: BUY ордер (0.01 лот)")
-    success_buy = place_order_simple(symbol, 'buy', 0.01)
-
-    time.sleep(2)
-
-    # Тест 2: SELL ордер
-    print(f"\n🔹 Тест 2: SELL ордер (0.01 лот)")
-    success_sell = place_order_simple(symbol, 'sell', 0.01)
+    write_lines([
+        f"\n🧪 Тестирование простых ордеров для {symbol}",
+        "=" * 50,
+        f"\n🔹 Тест 1: BUY ордер (0.01 лот)",
+        f"🔹 Тест 2: SELL ордер (0.01 лот)",
+    ])
+
+    symbol_info = get_symbol_info_cached(symbol)
+
+    # Тест 1 и 2: BUY и SELL ордера отправляются параллельно
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        buy_future = executor.submit(call_limited, place_order_simple, symbol, 'buy', 0.01, symbol_info)
+        sell_future = executor.submit(call_limited, place_order_simple, symbol, 'sell', 0.01, symbol_info)
+        success_buy = buy_future.result()
+        success_sell = sell_future.result()
 
     # Закрываем все ордера
-    from core.mt5_client import close_all_orders
-    print(f"\n🛑 Закрываем все тестовые ордера...")
+    write_lines([f"\n🛑 Закрываем все тестовые ордера..."])
     close_success = close_all_orders(symbol)
 
-    print(f"\n📊 Результаты простых ордеров:")
-    print(f"   ✅ BUY: {'Успешно' if success_buy else 'Ошибка'}")
-    print(f"   ✅ SELL: {'Успешно' if success_sell else 'Ошибка'}")
-    print(f"   ✅ Закрытие: {'Успешно' if close_success else 'Ошибка'}")
+    write_lines([
+        f"\n📊 Результаты простых ордеров:",
+        f"   ✅ BUY: {'Успешно' if success_buy else 'Ошибка'}",
+        f"   ✅ SELL: {'Успешно' if success_sell else 'Ошибка'}",
+        f"   ✅ Закрытие: {'Успешно' if close_success else 'Ошибка'}",
+    ])
 
     return success_buy or success_sell
 
@@ -116,82 +201,119 @@ def test_sltp_orders(symbol):
     """
     Тестирование ордеров со SL/TP
     """
-    print(f"\n🧪 Тестирование ордеров со SL/TP для {symbol}")
-    print("=" * 50)
-
-    # Тест 1: BUY ордер с SL/TP
-    print(f"\n🔹 Тест 1: BUY ордер с SL/TP (0.01 лот, SL=20, TP=30)")
-    success_buy = place_order_with_sltp(symbol, 'buy', 0.01, 20, 30)
-
-    time.sleep(2)
-
-    # Тест 2: SELL ордер с SL/TP
-    print(f"\n🔹 Тест 2: SELL ордер с SL/TP (0.01 лот, SL=20, TP=30)")
-    success_sell = place_order_with_sltp(symbol, 'sell', 0.01, 20, 30)
+    write_lines([
+        f"\n🧪 Тестирование ордеров со SL/TP для {symbol}",
+        "=" * 50,
+        f"\n🔹 Тест 1: BUY ордер с SL/TP (0.01 лот, SL=20, TP=30)",
+        f"🔹 Тест 2: SELL ордер с SL/TP (0.01 лот, SL=20, TP=30)",
+    ])
+
+    symbol_info = get_symbol_info_cached(symbol)
+
+    # Тест 1 и 2: BUY и SELL ордера с SL/TP отправляются параллельно
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        buy_future = executor.submit(call_limited, place_order_with_sltp, symbol, 'buy', 0.01, 20, 30, symbol_info)
+        sell_future = executor.submit(call_limited, place_order_with_sltp, symbol, 'sell', 0.01, 20, 30, symbol_info)
+        success_buy = buy_future.result()
+        success_sell = sell_future.result()
 
     # Закрываем все ордера
-    from core.mt5_client import close_all_orders
-    print(f"\n🛑 Закрываем все тестовые ордера...")
+    write_lines([f"\n🛑 Закрываем все тестовые ордера..."])
     close_success = close_all_orders(symbol)
 
-    print(f"\n📊 Результаты ордеров с SL/TP:")
-    print(f"   ✅ BUY: {'Успешно' if success_buy else 'Ошибка'}")
-    print(f"   ✅ SELL: {'Успешно' if success_sell else 'Ошибка'}")
-    print(f"   ✅ Закрытие: {'Успешно' if close_success else 'Ошибка'}")
+    write_lines([
+        f"\n📊 Результаты ордеров с SL/TP:",
+        f"   ✅ BUY: {'Успешно' if success_buy else 'Ошибка'}",
+        f"   ✅ SELL: {'Успешно' if success_sell else 'Ошибка'}",
+        f"   ✅ Закрытие: {'Успешно' if close_success else 'Ошибка'}",
+    ])
 
     return success_buy or success_sell
 
 
-def check_mt5_version():
+def check_mt5_version(version, terminal_info):
     """
     Проверка версии MT5
+
+    Возвращает (успех, строки отчета)
     """
-    print(f"\n🔍 Проверка версии MT5")
-    print("=" * 50)
+    lines = [f"\n🔍 Проверка версии MT5", "=" * 50]
 
     try:
-        version = mt5.version()
-        print(f"✅ Версия MT5: {version}")
+        lines.append(f"✅ Версия MT5: {version}")
 
-        terminal_info = mt5.terminal_info()
         if terminal_info:
-            print(f"✅ Терминал: {terminal_info.name}")
-            print(f"✅ Путь: {terminal_info.path}")
-            print(f"✅ Данные: {terminal_info.data_path}")
-            print(f"✅ Коммунити: {terminal_info.community_account}")
-            print(f"✅ Коммунити соединение: {terminal_info.community_connection}")
-
-        return True
+            lines += [
+                f"✅ Терминал: {terminal_info.name}",
+                f"✅ Путь: {terminal_info.path}",
+                f"✅ Данные: {terminal_info.data_path}",
+                f"✅ Коммунити: {terminal_info.community_account}",
+                f"✅ Коммунити соединение: {terminal_info.community_connection}",
+            ]
+
+        return True, lines
     except Exception as e:
-        print(f"❌ Ошибка проверки версии: {e}")
-        return False
+        lines.append(f"❌ Ошибка проверки версии: {e}")
+        return False, lines
 
 
 def main():
     """
     Главная функция диагностики
     """
-    import argparse
-
     parser = argparse.ArgumentParser(description='Диагностика проблем с торговлей AI Trading Robot')
     parser.add_argument('symbol', nargs='?', default='EURUSDrfd', help='Символ для диагностики')
+    parser.add_argument('--force', action='store_true', help='Игнорировать кэш и выполнить все проверки')
+    parser.add_argument('--max-age', type=float, default=60,
+                        help='Срок годности кэшированных результатов, секунд (по умолчанию 60)')
 
     args = parser.parse_args()
 
     print("🤖 AI Trading Robot - Диагностика торговли")
     print("=" * 60)
 
+    # Инициализируем MT5 один раз для всей диагностики
+    if not initialize_mt5():
+        print("❌ Не удалось инициализировать MT5")
+        return False
+
+    try:
+        cache = {} if args.force else load_diag_cache()
+
+        # При свежем кэше версия не нужна - запрашиваются только данные для ключа кэша
+        version = None
+        if is_section_fresh(cache, 'version', args.max_age) and is_section_fresh(cache, 'account', args.max_age):
+            terminal_info, account_info = mt5.terminal_info(), mt5.account_info()
+        else:
+            version, terminal_info, account_info = collect_terminal_state()
+
+        # Кэш недействителен, если изменилось подключение терминала или счет
+        state = [
+            bool(terminal_info and terminal_info.connected),
+            account_info.login if account_info else None,
+            account_info.server if account_info else None,
+        ]
+        if cache.get('state') != state:
+            cache = {'state': state}
+            if version is None:
+                version = mt5.version()
+    except Exception as e:
+        print(f"❌ Ошибка получения состояния терминала: {e}")
+        return False
+
     # Запускаем диагностику
     success = True
 
     # 1. Проверяем версию MT5
-    success &= check_mt5_version()
+    success &= run_section(cache, 'version', args.max_age, check_mt5_version, version, terminal_info)
 
     # 2. Диагностируем счет
-    success &= diagnose_account()
+    success &= run_section(cache, 'account', args.max_age, diagnose_account, account_info)
 
-    # 3. Диагностируем символ
-    success &= diagnose_symbol(args.symbol)
+    # 3. Диагностируем символ (котировки и разрешения торговли не кэшируются)
+    symbol_ok, symbol_lines = diagnose_symbol(args.symbol)
+    write_lines(symbol_lines)
+    success &= symbol_ok
 
     # 4. Тестируем простые ордера
     simple_success = test_simple_orders(args.symbol)
@@ -8,9 +8,9 @@ import sys
 
 
 def run_command(command):
-    """Выполняет команду и возвращает результат"""
+    """Выполняет команду (строку или список аргументов) и возвращает результат"""
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+        result = subprocess.run(command, shell=isinstance(command, str), capture_output=True, text=True)
         return result.returncode == 0, result.stdout, result.stderr
     except Exception as e:
         return False, "", str(e)
@@ -32,14 +32,29 @@ def main():
         "python-dotenv>=1.0.0"
     ]
 
-    for dep in dependencies:
-        print(f"📦 Устанавливаю {dep}...")
-        success, stdout, stderr = run_command(f"{sys.executable} -m pip install {dep}")
+    # Необязательные ускорения: numba - расчет индикаторов, pyarrow - дисковый кэш баров
+    optional_dependencies = [
+        "numba>=0.57",
+        "pyarrow>=12.0"
+    ]
+
+    # Один вызов pip: резолвер обрабатывает все пакеты разом
+    print(f"📦 Устанавливаю {len(dependencies)} пакетов: {', '.join(dependencies)}")
+    success, stdout, stderr = run_command([sys.executable, "-m", "pip", "install", *dependencies])
 
-        if success:
-            print(f"✅ {dep} установлен успешно")
-        else:
-            print(f"❌ Ошибка установки {dep}: {stderr}")
+    if success:
+        print("✅ Все пакеты установлены успешно")
+    else:
+        print(f"❌ Ошибка установки зависимостей: {stderr}")
+
+    # Ошибка установки необязательных пакетов не мешает работе проекта
+    print(f"📦 Устанавливаю необязательные пакеты: {', '.join(optional_dependencies)}")
+    success, stdout, stderr = run_command([sys.executable, "-m", "pip", "install", *optional_dependencies])
+
+    if success:
+        print("✅ Необязательные пакеты установлены успешно")
+    else:
+        print(f"⚠️  Необязательные пакеты не установлены (проект будет работать без ускорений): {stderr}")
 
     print("=" * 50)
     print("🧪 Проверка установки...")
@@ -66,6 +81,13 @@ def main():
             print(f"❌ Ошибка импорта {module}: {e}")
             all_imports_ok = False
 
+    for module in ("numba", "pyarrow"):
+        try:
+            __import__(module)
+            print(f"✅ {module} импортируется успешно")
+        except ImportError:
+            print(f"⚠️  {module} не установлен (необязательный)")
+
     if all_imports_ok:
         print("🎉 Все зависимости установлены успешно!")
         print("🚀 Теперь вы можете запустить проект:")
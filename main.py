@@ -5,10 +5,17 @@ AI Trading Robot v0.1.1
 """
 
 import argparse
+import atexit
+import logging
 import sys
 import os
+import signal
 import time
+import traceback
 from datetime import datetime
+from itertools import islice
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue
 
 # Добавляем путь к src
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -26,11 +33,10 @@ except ImportError as e:
     print("💡 Установите: pip install MetaTrader5")
     HAS_MT5 = False
 
+# Trader и ml.model_builder тянут pandas/scikit-learn - импортируются в режимах, где нужны
 try:
     from utils.config import load_config
-    from core.trader import Trader
     from core.mt5_client import initialize_mt5, close_all_orders, get_symbol_info, get_available_symbols
-    from ml.model_builder import train_model, load_model_for_symbol, get_available_models
 except ImportError as e:
     print(f"❌ Ошибка импорта: {e}")
     print("💡 Проверьте структуру папок и наличие необходимых файлов")
@@ -45,6 +51,11 @@ except ImportError as e:
     SymbolSelector = None
 
 
+# Снимок состояния MT5 для status_mode: повторные опросы из меню не обращаются к терминалу
+STATUS_CACHE_TTL = 5.0
+_STATUS_CACHE = {'ts': 0.0, 'data': None}
+
+
 def test_connection():
     """Тестирование подключения к MT5"""
     if not HAS_MT5:
@@ -63,7 +74,7 @@ def test_connection():
     print(f"✅ Подключение к MT5 успешно")
     print(f"📊 Доступно основных пар: {len(symbols)}")
     if symbols:
-        print("📈 Примеры доступных пар:", symbols[:5])
+        print("📈 Примеры доступных пар:", ", ".join(islice(symbols, 5)))
 
     return True
 
@@ -95,6 +106,7 @@ def train_mode(symbol=None):
     print(f"   Bid: {symbol_info['bid']:.5f}, Ask: {symbol_info['ask']:.5f}, Spread: {symbol_info['spread']:.5f}")
 
     # Запускаем обучение
+    from ml.model_builder import train_model
     return train_model(training_symbol)
 
 
@@ -111,10 +123,13 @@ def trade_mode(symbol=None):
 
     print(f"🚀 Запуск режима торговли для символа: {trading_symbol}")
 
-    # Проверяем подключение
-    if not initialize_mt5():
+    # Проверяем подключение; параметры символа кэшируются заранее для торгового цикла
+    if not initialize_mt5([trading_symbol]):
         return False
 
+    from core.trader import Trader, SHUTDOWN
+    from ml.model_builder import load_model_for_symbol
+
     # Проверяем наличие модели
     model = load_model_for_symbol(trading_symbol)
     if not model:
@@ -131,6 +146,11 @@ def trade_mode(symbol=None):
     print(f"✅ Символ {trading_symbol} доступен")
     print(f"💰 Текущая цена: Bid={symbol_info['bid']:.5f}, Ask={symbol_info['ask']:.5f}")
 
+    # SIGTERM обрабатывается как Ctrl+C (KeyboardInterrupt): обработчик не трогает SHUTDOWN,
+    # чтобы не захватывать блокировку события, которую может держать прерванный Event.wait
+    SHUTDOWN.clear()
+    previous_sigterm = signal.signal(signal.SIGTERM, signal.default_int_handler)
+
     # Запускаем торговлю
     try:
         trader = Trader(config)
@@ -141,67 +161,91 @@ def trade_mode(symbol=None):
         return True
     except Exception as e:
         print(f"❌ Ошибка в торговом режиме: {e}")
-        import traceback
         traceback.print_exc()
         return False
+    finally:
+        # Возвращаем обработчик (режим может вызываться из меню контроллера)
+        signal.signal(signal.SIGTERM, previous_sigterm)
+
+
+def _collect_mt5_status(symbol):
+    """Снимок состояния MT5 для статуса: (символ, подключено, информация о символе)"""
+    if not (HAS_MT5 and initialize_mt5()):
+        return symbol, False, None
+
+    return symbol, True, get_symbol_info(symbol)
 
 
 def status_mode():
     """Режим статуса системы"""
     config = load_config()
 
-    print("\n" + "=" * 60)
-    print("           СТАТУС AI TRADING ROBOT")
-    print("=" * 60)
+    # Отчет собирается в список строк и выводится одной записью
+    lines = []
 
-    # Статус MT5
-    print("\n🔌 Подключение MT5:")
-    if HAS_MT5 and initialize_mt5():
-        print("   ✅ Подключено")
+    lines.append("\n" + "=" * 60)
+    lines.append("           СТАТУС AI TRADING ROBOT")
+    lines.append("=" * 60)
+
+    # Статус MT5 (снимок не старше STATUS_CACHE_TTL секунд)
+    lines.append("\n🔌 Подключение MT5:")
+    current_symbol = config['trading']['symbol']
+    snapshot = _STATUS_CACHE['data']
+    if (snapshot is None or snapshot[0] != current_symbol
+            or time.monotonic() - _STATUS_CACHE['ts'] >= STATUS_CACHE_TTL):
+        snapshot = _collect_mt5_status(current_symbol)
+        _STATUS_CACHE['ts'] = time.monotonic()
+        _STATUS_CACHE['data'] = snapshot
+
+    _, connected, symbol_info = snapshot
+    if connected:
+        lines.append("   ✅ Подключено")
 
         # Информация о текущем символе
-        current_symbol = config['trading']['symbol']
-        symbol_info = get_symbol_info(current_symbol)
         if symbol_info:
-            print(f"   📊 Текущий символ: {current_symbol}")
-            print(f"   💰 Цена: Bid={symbol_info['bid']:.5f}, Ask={symbol_info['ask']:.5f}")
-            print(f"   📏 Спред: {symbol_info['spread']:.5f}")
+            lines.append(f"   📊 Текущий символ: {current_symbol}")
+            lines.append(f"   💰 Цена: Bid={symbol_info['bid']:.5f}, Ask={symbol_info['ask']:.5f}")
+            lines.append(f"   📏 Спред: {symbol_info['spread']:.5f}")
         else:
-            print(f"   ❌ Символ {current_symbol} недоступен")
+            lines.append(f"   ❌ Символ {current_symbol} недоступен")
     else:
-        print("   ❌ Не подключено (MetaTrader5 не установлен или недоступен)")
+        lines.append("   ❌ Не подключено (MetaTrader5 не установлен или недоступен)")
 
     # Статус модели
-    print("\n🤖 ML Модель:")
+    lines.append("\n🤖 ML Модель:")
     model_info = config['model']
     current_model_path = model_info.get('current_model', '')
     if current_model_path and os.path.exists(current_model_path):
-        print(f"   ✅ Модель: {os.path.basename(current_model_path)}")
-        print(f"   🎯 Точность: {model_info.get('accuracy', 'N/A')}")
-        print(f"   🔧 Признаков: {model_info.get('features_count', 'N/A')}")
-        print(f"   📅 Обучена: {model_info.get('last_trained', 'N/A')}")
+        lines.append(f"   ✅ Модель: {os.path.basename(current_model_path)}")
+        lines.append(f"   🎯 Точность: {model_info.get('accuracy', 'N/A')}")
+        lines.append(f"   🔧 Признаков: {model_info.get('features_count', 'N/A')}")
+        lines.append(f"   📅 Обучена: {model_info.get('last_trained', 'N/A')}")
     else:
-        print("   ❌ Модель не обучена или файл не найден")
+        lines.append("   ❌ Модель не обучена или файл не найден")
 
     # Доступные модели
-    print("\n📚 Доступные модели:")
+    lines.append("\n📚 Доступные модели:")
+    from ml.model_builder import get_available_models
     models = get_available_models()
     if models:
-        for i, model in enumerate(models[:5], 1):  # Показываем первые 5
-            print(f"   {i}. {model['symbol']} - {model['date']}")
+        for i, model in enumerate(islice(models, 5), 1):  # Показываем первые 5
+            lines.append(f"   {i}. {model['symbol']} - {model['date']}")
         if len(models) > 5:
-            print(f"   ... и еще {len(models) - 5} моделей")
+            lines.append(f"   ... и еще {len(models) - 5} моделей")
     else:
-        print("   ❌ Нет доступных моделей")
+        lines.append("   ❌ Нет доступных моделей")
 
     # Настройки торговли
-    print("\n⚙️ Настройки торговли:")
+    lines.append("\n⚙️ Настройки торговли:")
     trading_config = config['trading']
-    print(f"   📈 Символ: {trading_config['symbol']}")
-    print(f"   📦 Лот: {trading_config['lot_size']}")
-    print(f"   📏 Макс. спред: {trading_config['max_spread']}")
+    lines.append(f"   📈 Символ: {trading_config['symbol']}")
+    lines.append(f"   📦 Лот: {trading_config['lot_size']}")
+    lines.append(f"   📏 Макс. спред: {trading_config['max_spread']}")
+
+    lines.append("\n" + "=" * 60)
 
-    print("\n" + "=" * 60)
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
 
     return True
 
@@ -221,7 +265,6 @@ def select_symbol_mode(auto_train=True):
         return selector.run_selection_flow(auto_train=auto_train)
     except Exception as e:
         print(f"❌ Ошибка в режиме выбора символа: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -268,19 +311,47 @@ def emergency_stop_mode():
     return success
 
 
+# Таблица режимов: имя режима -> обработчик аргументов командной строки
+_DISPATCH = {
+    'test': lambda args: test_connection(),
+    'train': lambda args: train_mode(args.symbol),
+    'trade': lambda args: trade_mode(args.symbol),
+    'status': lambda args: status_mode(),
+    'stop': lambda args: stop_mode(args.symbol),
+    'emergency-stop': lambda args: emergency_stop_mode(),
+    'select-symbol': lambda args: select_symbol_mode(auto_train=not args.no_train),
+}
+
+
+def _setup_logging(verbose):
+    """
+    Настройка логирования через очередь: запись в консоль выполняет фоновый поток,
+    поэтому подробный вывод (--verbose) не задерживает отправку ордеров
+    """
+    queue = Queue(-1)
+    listener = QueueListener(queue, logging.StreamHandler())
+    logging.basicConfig(level=logging.DEBUG if verbose else logging.WARNING, format='%(message)s',
+                        handlers=[QueueHandler(queue)])
+    listener.start()
+    atexit.register(listener.stop)
+
+
 def main():
     """Главная функция"""
     parser = argparse.ArgumentParser(description='AI Trading Robot v0.1.1')
     parser.add_argument('--mode', type=str, required=True,
-                        choices=['test', 'train', 'trade', 'status', 'stop',
-                                 'emergency-stop', 'select-symbol'],
+                        choices=list(_DISPATCH),
                         help='Режим работы')
     parser.add_argument('--symbol', type=str, help='Торговый символ (например, EURUSD)')
     parser.add_argument('--no-train', action='store_true',
                         help='Пропустить автообучение при выборе символа')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Подробный вывод (загрузка баров, параметры ордеров)')
 
     args = parser.parse_args()
 
+    _setup_logging(args.verbose)
+
     print(f"\n🤖 AI Trading Robot v0.1.1")
     print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"🎮 Режим: {args.mode}")
@@ -293,23 +364,7 @@ def main():
         return False
 
     try:
-        if args.mode == 'test':
-            success = test_connection()
-        elif args.mode == 'train':
-            success = train_mode(args.symbol)
-        elif args.mode == 'trade':
-            success = trade_mode(args.symbol)
-        elif args.mode == 'status':
-            success = status_mode()
-        elif args.mode == 'select-symbol':
-            success = select_symbol_mode(auto_train=not args.no_train)
-        elif args.mode == 'stop':
-            success = stop_mode(args.symbol)
-        elif args.mode == 'emergency-stop':
-            success = emergency_stop_mode()
-        else:
-            print(f"❌ Неизвестный режим: {args.mode}")
-            success = False
+        success = _DISPATCH[args.mode](args)
 
         if success:
             print(f"\n✅ Режим '{args.mode}' завершен успешно")
@@ -323,7 +378,6 @@ def main():
         return False
     except Exception as e:
         print(f"\n💥 Критическая ошибка: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
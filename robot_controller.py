@@ -4,7 +4,6 @@
 Упрощенный скрипт для быстрого управления
 """
 
-import os
 import sys
 import time
 from pathlib import Path
@@ -13,11 +12,21 @@ from pathlib import Path
 root_dir = Path(__file__).parent
 sys.path.append(str(root_dir))
 
+# Режимы вызываются напрямую, без запуска нового интерпретатора на каждую команду
+from main import test_connection, train_mode, trade_mode, status_mode, stop_mode, emergency_stop_mode
 
-def run_command(command):
-    """Выполнение команды"""
-    print(f"🚀 Выполнение: {command}")
-    os.system(command)
+
+def run_mode(title, mode_func, *args):
+    """Выполнение режима робота в текущем процессе"""
+    print(f"🚀 Выполнение: {title}")
+    try:
+        return mode_func(*args)
+    except KeyboardInterrupt:
+        print("\n⏹️ Команда прервана пользователем")
+        return False
+    except Exception as e:
+        print(f"❌ Ошибка выполнения команды: {e}")
+        return False
 
 
 def main():
@@ -39,32 +48,32 @@ def main():
         choice = input("\nВыберите команду (1-8): ").strip()
 
         if choice == '1':
-            run_command('python main.py --mode status')
+            run_mode('статус', status_mode)
 
         elif choice == '2':
             symbol = input("Введите символ (по умолчанию EURUSDrfd): ").strip() or 'EURUSDrfd'
-            run_command(f'python main.py --mode train --symbol {symbol}')
+            run_mode(f'обучение {symbol}', train_mode, symbol)
 
         elif choice == '3':
             symbol = input("Введите символ (по умолчанию EURUSDrfd): ").strip() or 'EURUSDrfd'
             print("🚀 Запуск торговли... Для остановки нажмите Ctrl+C в терминале")
-            run_command(f'python main.py --mode trade --symbol {symbol}')
+            run_mode(f'торговля {symbol}', trade_mode, symbol)
 
         elif choice == '4':
-            run_command('python main.py --mode stop')
+            run_mode('остановка', stop_mode)
 
         elif choice == '5':
             confirm = input("🚨 ВНИМАНИЕ: Это закроет ВСЕ позиции! Продолжить? (y/N): ")
             if confirm.lower() == 'y':
-                run_command('python main.py --mode emergency-stop')
+                run_mode('аварийная остановка', emergency_stop_mode)
             else:
                 print("❌ Отменено")
 
         elif choice == '6':
-            run_command('python main.py --mode test')
+            run_mode('тест подключения', test_connection)
 
         elif choice == '7':
-            run_command('python main.py --mode status')
+            run_mode('статус', status_mode)
 
         elif choice == '8':
             print("👋 Выход из контроллера")
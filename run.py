@@ -9,6 +9,21 @@ import os
 # Добавляем путь к src
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
+# Режимы вызываются напрямую, без запуска нового интерпретатора
+from main import test_connection, train_mode, trade_mode, initialize_mt5, get_available_symbols
+
+
+def show_symbols():
+    """Вывод доступных основных валютных пар"""
+    if not initialize_mt5():
+        return False
+
+    symbols = get_available_symbols()
+    print(f"📊 Доступно основных пар: {len(symbols)}")
+    for symbol in symbols:
+        print(f"   📈 {symbol}")
+    return True
+
 
 def main():
     print("🤖 AI Trading Robot - Быстрый запуск")
@@ -22,25 +37,15 @@ def main():
     choice = input("\nВыберите действие (1-5): ").strip()
 
     if choice == "1":
-        symbol = input("Введите символ (или Enter для выбора): ").strip()
-        if symbol:
-            os.system(f"python main.py --mode test --symbol {symbol}")
-        else:
-            os.system("python main.py --mode test")
+        test_connection()
     elif choice == "2":
         symbol = input("Введите символ (или Enter для выбора): ").strip()
-        if symbol:
-            os.system(f"python main.py --mode train --symbol {symbol}")
-        else:
-            os.system("python main.py --mode train")
+        train_mode(symbol or None)
     elif choice == "3":
         symbol = input("Введите символ (или Enter для выбора): ").strip()
-        if symbol:
-            os.system(f"python main.py --mode trade --symbol {symbol}")
-        else:
-            os.system("python main.py --mode trade")
+        trade_mode(symbol or None)
     elif choice == "4":
-        os.system("python main.py --mode symbols")
+        show_symbols()
     elif choice == "5":
         print("👋 До свидания!")
     else:
@@ -49,4 +54,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,238 @@
+import numpy as np
+
+# Numba необязателен: без него вызывающий код использует реализации на pandas
+try:
+    from numba import njit
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Заглушка декоратора numba.njit - возвращает функцию без изменений"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# error_model='numpy': деление на ноль дает inf/nan, как в pandas, а не исключение.
+# fastmath не используется - он допускает отсутствие NaN/inf, а индикаторы на них опираются.
+
+@njit(cache=True, error_model='numpy')
+def ema(values, span):
+    """
+    Экспоненциальная скользящая средняя (эквивалент Series.ewm(span=span).mean())
+    """
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    result = np.empty(values.shape[0], dtype=np.float64)
+
+    numerator = 0.0
+    denominator = 0.0
+    for i in range(values.shape[0]):
+        numerator = values[i] + decay * numerator
+        denominator = 1.0 + decay * denominator
+        result[i] = numerator / denominator
+
+    return result
+
+
+@njit(cache=True, error_model='numpy')
+def rsi(values, period):
+    """
+    RSI на простых скользящих средних приростов и потерь
+    (эквивалент FeatureEngineer.calculate_rsi на pandas)
+    """
+    n = values.shape[0]
+    result = np.full(n, np.nan)
+
+    # Разности цен; первая равна 0, как после delta.where(...) в pandas
+    deltas = np.zeros(n)
+    for i in range(1, n):
+        deltas[i] = values[i] - values[i - 1]
+
+    for i in range(period - 1, n):
+        gain_sum = 0.0
+        loss_sum = 0.0
+        for j in range(i - period + 1, i + 1):
+            if deltas[j] > 0:
+                gain_sum += deltas[j]
+            elif deltas[j] < 0:
+                loss_sum -= deltas[j]
+
+        rs = (gain_sum / period) / (loss_sum / period)
+        result[i] = 100.0 - 100.0 / (1.0 + rs)
+
+    return result
+
+
+@njit(cache=True, error_model='numpy')
+def atr(high, low, close, period):
+    """
+    Средний истинный диапазон на простой скользящей средней
+    (эквивалент FeatureEngineer.calculate_atr на pandas)
+    """
+    n = high.shape[0]
+    result = np.full(n, np.nan)
+
+    # Истинный диапазон; у первого бара нет предыдущего закрытия (NaN, как после shift в pandas)
+    true_range = np.empty(n)
+    if n > 0:
+        true_range[0] = np.nan
+    for i in range(1, n):
+        high_low = high[i] - low[i]
+        high_close = abs(high[i] - close[i - 1])
+        low_close = abs(low[i] - close[i - 1])
+        true_range[i] = max(high_low, high_close, low_close)
+
+    # Первое полное окно без NaN заканчивается на баре period
+    for i in range(period, n):
+        total = 0.0
+        for j in range(i - period + 1, i + 1):
+            total += true_range[j]
+        result[i] = total / period
+
+    return result
+
+
+@njit(cache=True, error_model='numpy')
+def rolling_means(values, windows):
+    """
+    Простые скользящие средние для нескольких окон за один проход по values
+    (эквивалент Series.rolling(window).mean() для каждого окна)
+
+    Возвращает массив (len(windows), len(values)); окно с NaN дает NaN, как в pandas
+    """
+    n = values.shape[0]
+    k = windows.shape[0]
+    result = np.full((k, n), np.nan)
+    totals = np.zeros(k)
+    nan_counts = np.zeros(k, dtype=np.int64)
+
+    for i in range(n):
+        x = values[i]
+        for w in range(k):
+            window = windows[w]
+
+            # Добавляем новый элемент окна
+            if np.isnan(x):
+                nan_counts[w] += 1
+            else:
+                totals[w] += x
+
+            # Убираем элемент, вышедший из окна
+            if i >= window:
+                old = values[i - window]
+                if np.isnan(old):
+                    nan_counts[w] -= 1
+                else:
+                    totals[w] -= old
+
+            if i >= window - 1 and nan_counts[w] == 0:
+                result[w, i] = totals[w] / window
+
+    return result
+
+
+@njit(cache=True, error_model='numpy')
+def rolling_stds(values, windows):
+    """
+    Скользящее стандартное отклонение (ddof=1) для нескольких окон
+    (эквивалент Series.rolling(window).std() для каждого окна)
+
+    Отклонения считаются от среднего окна, а не через сумму квадратов:
+    для цен порядка 1.1 с малой дисперсией сумма квадратов теряет точность
+    """
+    n = values.shape[0]
+    k = windows.shape[0]
+    result = np.full((k, n), np.nan)
+
+    for w in range(k):
+        window = windows[w]
+        for i in range(window - 1, n):
+            total = 0.0
+            for j in range(i - window + 1, i + 1):
+                total += values[j]
+            # NaN в окне дает NaN в сумме
+            if np.isnan(total):
+                continue
+
+            mean = total / window
+            squares = 0.0
+            for j in range(i - window + 1, i + 1):
+                deviation = values[j] - mean
+                squares += deviation * deviation
+            result[w, i] = np.sqrt(squares / (window - 1))
+
+    return result
+
+
+@njit(cache=True, error_model='numpy')
+def rolling_skew_kurt(values, window):
+    """
+    Скользящие асимметрия и эксцесс за один проход по окнам
+    (эквивалент Series.rolling(window).skew() и .kurt())
+    """
+    n = values.shape[0]
+    skew = np.full(n, np.nan)
+    kurt = np.full(n, np.nan)
+    count = float(window)
+
+    for i in range(window - 1, n):
+        total = 0.0
+        for j in range(i - window + 1, i + 1):
+            total += values[j]
+        if np.isnan(total):
+            continue
+
+        # Центральные моменты окна
+        mean = total / count
+        m2 = 0.0
+        m3 = 0.0
+        m4 = 0.0
+        for j in range(i - window + 1, i + 1):
+            deviation = values[j] - mean
+            squared = deviation * deviation
+            m2 += squared
+            m3 += squared * deviation
+            m4 += squared * squared
+        m2 /= count
+        m3 /= count
+        m4 /= count
+
+        # Окно из одинаковых значений: pandas возвращает 0 и -3
+        if m2 == 0.0:
+            skew[i] = 0.0
+            kurt[i] = -3.0
+            continue
+
+        if window >= 3:
+            skew[i] = np.sqrt(count * (count - 1.0)) * m3 / ((count - 2.0) * m2 ** 1.5)
+        if window >= 4:
+            kurt[i] = ((count * count - 1.0) * m4 / (m2 * m2) - 3.0 * (count - 1.0) ** 2) \
+                / ((count - 2.0) * (count - 3.0))
+
+    return skew, kurt
+
+
+def warmup():
+    """
+    Компиляция ядер (или загрузка из кэша numba) до первого расчета признаков,
+    чтобы задержка JIT не приходилась на первое торговое решение
+    """
+    if not HAS_NUMBA:
+        return
+
+    # Типы аргументов совпадают с вызовами из FeatureEngineer: float64-массивы и int64.
+    # Series.to_numpy() при copy-on-write в pandas возвращает массив только для чтения -
+    # для numba это отдельная сигнатура, поэтому компилируются оба варианта
+    windows = np.array([2], dtype=np.int64)
+    readonly = np.ones(8)
+    readonly.flags.writeable = False
+    for values in (np.ones(8), readonly):
+        ema(values, 2)
+        rsi(values, 2)
+        atr(values, values, values, 2)
+        rolling_means(values, windows)
+        rolling_stds(values, windows)
+        rolling_skew_kurt(values, 4)
@@ -1,6 +1,14 @@
 import pandas as pd
-from datetime import datetime, timedelta
+import atexit
+import logging
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import threading
 import time
+from types import MappingProxyType
 
 # Проверяем наличие MetaTrader5
 try:
@@ -11,16 +19,244 @@ except ImportError:
     print("❌ MetaTrader5 не установлен. Установите: pip install MetaTrader5")
     HAS_MT5 = False
 
+# pyarrow необязателен: без него дисковый кэш баров (data.disk_cache) не используется
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Подробности, выводимые на каждом цикле торговли (загрузка баров, параметры запросов,
+# трассировки исключений), пишутся в лог на уровне DEBUG; результаты и ошибки по-прежнему выводятся через print
+logger = logging.getLogger(__name__)
+
+# Состояние подключения к терминалу (инициализация выполняется один раз на процесс)
+_INITIALIZED = False
+
+# Редко меняющиеся параметры символа
+StaticSymbolInfo = namedtuple('StaticSymbolInfo', [
+    'name', 'digits', 'point', 'trade_mode', 'trade_allowed', 'trade_stops_level',
+    'trade_contract_size', 'currency_base', 'currency_profit', 'currency_margin',
+])
+
+# Кэш статических параметров: символ -> (StaticSymbolInfo, время истечения по time.monotonic)
+# Сбрасывается при переподключении; TTL нужен, чтобы подхватить смену режима торговли
+_STATIC_INFO = {}
+_STATIC_INFO_TTL = 60.0
+
+# Основные forex пары
+_FOREX_MAJORS = frozenset({
+    'EURUSD', 'GBPUSD', 'USDJPY', 'USDCHF',
+    'AUDUSD', 'USDCAD', 'NZDUSD', 'EURGBP',
+    'EURJPY', 'EURCHF', 'GBPJPY', 'AUDJPY'
+})
+
+# Имя символа содержит основную пару с любым постфиксом брокера
+# (EURUSDrfd, EURUSDm, EURUSD_i, EURUSD.m, ...) - один проход вместо перебора пар
+_FOREX_MAJORS_RE = re.compile('|'.join(sorted(_FOREX_MAJORS)))
+
+# Неизменяемая часть торгового запроса
+_ORDER_TEMPLATE = {
+    "action": mt5.TRADE_ACTION_DEAL,
+    "deviation": 20,
+    "magic": 234000,
+    "type_time": mt5.ORDER_TIME_GTC,
+    "type_filling": mt5.ORDER_FILLING_IOC,
+} if HAS_MT5 else {}
+
+# Строковый таймфрейм -> числовая константа MT5
+_TIMEFRAME_MAP = {
+    'M1': mt5.TIMEFRAME_M1,
+    'M5': mt5.TIMEFRAME_M5,
+    'M15': mt5.TIMEFRAME_M15,
+    'M30': mt5.TIMEFRAME_M30,
+    'H1': mt5.TIMEFRAME_H1,
+    'H4': mt5.TIMEFRAME_H4,
+    'D1': mt5.TIMEFRAME_D1,
+    'W1': mt5.TIMEFRAME_W1,
+    'MN1': mt5.TIMEFRAME_MN1
+} if HAS_MT5 else {}
+
+# Сторона ордера -> (тип ордера MT5, поле цены тика, направление): BUY по ask, SELL по bid.
+# Любое значение, кроме 'buy', считается продажей
+_ORDER_SIDES = {
+    'buy': (mt5.ORDER_TYPE_BUY, 'ask', 1),
+    'sell': (mt5.ORDER_TYPE_SELL, 'bid', -1),
+} if HAS_MT5 else {}
+
+# Тип позиции -> (тип закрывающей сделки, поле цены тика): BUY закрывается по bid, SELL - по ask
+_CLOSE_SIDES = {
+    mt5.POSITION_TYPE_BUY: (mt5.ORDER_TYPE_SELL, 'bid'),
+    mt5.POSITION_TYPE_SELL: (mt5.ORDER_TYPE_BUY, 'ask'),
+} if HAS_MT5 else {}
+
+# Закрытие позиций (снимок позиций -> отправка запросов) выполняется атомарно:
+# два параллельных закрытия не должны отправлять запросы по одним и тем же позициям
+_CLOSE_LOCK = threading.RLock()
+
+
+def _max_concurrent(default=8):
+    """
+    Лимит одновременных обращений к терминалу из переменной MT5_MAX_CONCURRENT (не меньше 1)
+
+    Некорректное значение не должно ломать импорт модуля - используется значение по умолчанию
+    """
+    value = os.environ.get('MT5_MAX_CONCURRENT')
+    if value is None:
+        return default
+
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning("Некорректное значение MT5_MAX_CONCURRENT=%r, используется %d", value, default)
+        return default
+
+
+# Ограничение одновременных обращений к терминалу из пулов потоков (закрытие позиций),
+# чтобы не упираться в лимит запросов брокера (TRADE_RETCODE_TOO_MANY_REQUESTS)
+_MT5_SEMAPHORE = threading.BoundedSemaphore(_max_concurrent())
+
+# Максимум одновременных запросов на закрытие позиций
+_CLOSE_WORKERS = 8
+
+# Описания кодов возврата торгового сервера
+_ERROR_DESCRIPTIONS = MappingProxyType({
+    10000: "TRADE_RETCODE_REQUOTE - Требуется перекотировка",
+    10001: "TRADE_RETCODE_REJECT - Запрос отклонен",
+    10002: "TRADE_RETCODE_CANCEL - Запрос отменен",
+    10003: "TRADE_RETCODE_PLACED - Ордер размещен",
+    10004: "TRADE_RETCODE_DONE - Сделка исполнена",
+    10005: "TRADE_RETCODE_DONE_PARTIAL - Сделка исполнена частично",
+    10006: "TRADE_RETCODE_ERROR - Ошибка обработки запроса",
+    10007: "TRADE_RETCODE_TIMEOUT - Запрос отменен по таймауту",
+    10008: "TRADE_RETCODE_INVALID - Неверный запрос",
+    10009: "TRADE_RETCODE_INVALID_VOLUME - Неверный объем",
+    10010: "TRADE_RETCODE_INVALID_PRICE - Неверная цена",
+    10011: "TRADE_RETCODE_INVALID_STOPS - Неверные стопы",
+    10012: "TRADE_RETCODE_TRADE_DISABLED - Торговля запрещена",
+    10013: "TRADE_RETCODE_MARKET_CLOSED - Рынок закрыт",
+    10014: "TRADE_RETCODE_NO_MONEY - Недостаточно средств",
+    10015: "TRADE_RETCODE_PRICE_CHANGED - Цена изменилась",
+    10016: "TRADE_RETCODE_PRICE_OFF - Нет котировок",
+    10017: "TRADE_RETCODE_INVALID_EXPIRATION - Неверная дата экспирации",
+    10018: "TRADE_RETCODE_ORDER_CHANGED - Ордер изменен",
+    10019: "TRADE_RETCODE_TOO_MANY_REQUESTS - Слишком много запросов",
+    10020: "TRADE_RETCODE_NO_CHANGES - Нет изменений",
+    10021: "TRADE_RETCODE_SERVER_DISABLES_AT - Автотрейдинг запрещен сервером",
+    10022: "TRADE_RETCODE_CLIENT_DISABLES_AT - Автотрейдинг запрещен клиентом",
+    10023: "TRADE_RETCODE_LOCKED - Запрос заблокирован",
+    10024: "TRADE_RETCODE_FROZEN - Ордер или позиция заморожены",
+    10025: "TRADE_RETCODE_INVALID_FILL - Неверный тип исполнения",
+    10026: "TRADE_RETCODE_CONNECTION - Нет соединения с торговым сервером",
+    10027: "TRADE_RETCODE_ONLY_REAL - Разрешена только реальная торговля",
+    10028: "TRADE_RETCODE_LIMIT_ORDERS - Достигнут лимит ордеров",
+    10029: "TRADE_RETCODE_LIMIT_VOLUME - Достигнут лимит объема",
+    10030: "TRADE_RETCODE_INVALID_ORDER - Неверный ордер",
+    10031: "TRADE_RETCODE_POSITION_CLOSED - Позиция уже закрыта",
+    10032: "TRADE_RETCODE_INVALID_CLOSE_VOLUME - Неверный объем для закрытия",
+    10033: "TRADE_RETCODE_CLOSE_ORDER_EXIST - Уже есть ордер на закрытие",
+    10034: "TRADE_RETCODE_LIMIT_POSITIONS - Достигнут лимит позиций",
+})
+
+# Последние котировки для get_current_price: символ -> (время истечения, bid, ask)
+# Розничные потоки редко дают больше 10 тиков в секунду
+_TICK_CACHE = {}
+_TICK_CACHE_TTL = 0.1
+
+# Символы, уже добавленные в Market Watch через symbol_select (сбрасывается при переподключении)
+_SELECTED_SYMBOLS = set()
+
+# Кэш загруженных баров: (символ, числовой таймфрейм) -> DataFrame
+_BAR_CACHE = {}
+
+# Приведение цен OHLC к float32 (data.downcast_float32 в конфиге)
+_FLOAT32_PRICES = {'open': 'float32', 'high': 'float32', 'low': 'float32', 'close': 'float32'}
+
+# Целые до 2**24 представимы в float32 точно: цена в пунктах должна быть меньше,
+# иначе приведение теряет последний знак котировки
+_FLOAT32_EXACT_LIMIT = 2 ** 24
+
+# Сколько последних баров запрашивать при дозагрузке к кэшу: обычно между опросами
+# появляется не больше одного нового бара, при разрыве запрос расширяется
+_POLL_BARS = 2
+_INCREMENTAL_BARS = 10
+
+# Дисковый кэш баров: cache/{сервер}_{логин}/{символ}_{таймфрейм}.parquet - история
+# другого сервера или счета не склеивается с сохраненной. После перезапуска разрыв
+# с последним сохраненным баром может быть больше, поэтому запрос расширяется сильнее
+_DISK_CACHE_DIR = 'cache'
+_DISK_CACHE_BARS = (_INCREMENTAL_BARS, 100, 1000)
+
+# Кэш отсутствующих символов: символ -> время истечения (time.monotonic)
+_SYMBOL_NEG_CACHE = {}
+_SYMBOL_NEG_CACHE_TTL = 5.0
+
+
+def call_limited(func, *args):
+    """
+    Вызов func из пула потоков с ограничением числа одновременных обращений к терминалу
+
+    Общий лимит (MT5_MAX_CONCURRENT) действует и для пулов потоков вне модуля
+    """
+    with _MT5_SEMAPHORE:
+        return func(*args)
+
+
+def _ensure_connected():
+    """
+    Проверка, что терминал доступен и подключен к торговому серверу
+    """
+    terminal_info = mt5.terminal_info()
+    return terminal_info is not None and terminal_info.connected
 
-def initialize_mt5():
+
+def initialize_mt5(symbols=None):
     """
     Инициализация подключения к MT5
+
+    Повторные вызовы не переподключаются к терминалу, пока соединение не потеряно.
+    Если передан список symbols, кэш статических параметров заполняется одним symbols_get,
+    а символы добавляются в Market Watch
     """
     if not HAS_MT5:
         print("❌ MetaTrader5 не установлен")
         return False
 
+    if not (_INITIALIZED and _ensure_connected()) and not _connect():
+        return False
+
+    if symbols:
+        _get_symbol_names()
+        for symbol in symbols:
+            _select_symbol(symbol)
+
+    return True
+
+
+def _reset_caches():
+    """
+    Сброс всех кэшей, привязанных к соединению с терминалом и счету
+    """
+    _STATIC_INFO.clear()
+    _SELECTED_SYMBOLS.clear()
+    _SYMBOL_NEG_CACHE.clear()
+    _TICK_CACHE.clear()
+    # Бары другого сервера не должны склеиваться с кэшированной историей
+    _BAR_CACHE.clear()
+    _symbol_names_cached.cache_clear()
+    _cached_symbol_info.cache_clear()
+
+
+def _connect():
+    """
+    Подключение к терминалу со сбросом кэшей, привязанных к соединению
+    """
+    global _INITIALIZED
+
     try:
+        _reset_caches()
+
         if not mt5.initialize():
             print("❌ Ошибка инициализации MT5, код ошибки:", mt5.last_error())
             return False
@@ -41,12 +277,44 @@ def initialize_mt5():
         else:
             print("⚠️ Не удалось получить информацию о счете")
 
+        if not _INITIALIZED:
+            atexit.register(mt5.shutdown)
+        _INITIALIZED = True
         return True
     except Exception as e:
         print(f"❌ Ошибка инициализации MT5: {e}")
         return False
 
 
+@lru_cache(maxsize=1)
+def _symbol_names_cached(account_key):
+    symbols = mt5.symbols_get()
+    if symbols is None:
+        return None
+
+    # Тот же ответ терминала заполняет кэш статических параметров всех символов,
+    # и последующие проверки торговли не запрашивают symbol_info по одному
+    expires_at = time.monotonic() + _STATIC_INFO_TTL
+    for symbol_info in symbols:
+        _STATIC_INFO[symbol_info.name] = (_to_static_info(symbol_info), expires_at)
+
+    return tuple(s.name for s in symbols)
+
+
+def _get_symbol_names():
+    """
+    Список имен символов терминала, кэшируется до смены счета
+    """
+    account_info = mt5.account_info()
+    account_key = (account_info.login, account_info.server) if account_info else None
+
+    symbol_names = _symbol_names_cached(account_key)
+    if symbol_names is None:
+        # Неудачный ответ не кэшируем
+        _symbol_names_cached.cache_clear()
+    return symbol_names
+
+
 def get_available_symbols():
     """
     Получает список основных валютных пар из MT5
@@ -56,33 +324,13 @@ def get_available_symbols():
         return []
 
     try:
-        symbols = mt5.symbols_get()
-        if symbols is None:
+        symbol_names = _get_symbol_names()
+        if symbol_names is None:
             print("❌ Не удалось получить список символов из MT5")
             return []
 
-        symbol_names = [s.name for s in symbols]
-
-        # Основные forex пары
-        forex_majors = [
-            'EURUSD', 'GBPUSD', 'USDJPY', 'USDCHF',
-            'AUDUSD', 'USDCAD', 'NZDUSD', 'EURGBP',
-            'EURJPY', 'EURCHF', 'GBPJPY', 'AUDJPY'
-        ]
-
-        # Ищем доступные основные пары
-        available_majors = [s for s in symbol_names if s in forex_majors]
-
-        # Также добавляем популярные пары с постфиксами
-        for symbol in symbol_names:
-            if any(major in symbol for major in forex_majors) and symbol not in available_majors:
-                # Проверяем, что это действительно forex пара
-                if any(postfix in symbol for postfix in ['', 'rfd', 'micro', 'mini']):
-                    available_majors.append(symbol)
-
-        # Сортируем для удобства
-        available_majors.sort()
-        return available_majors
+        # Основные пары и их варианты с постфиксами, отсортированные для удобства
+        return sorted(name for name in symbol_names if _FOREX_MAJORS_RE.search(name))
 
     except Exception as e:
         print(f"❌ Ошибка при получении списка символов: {e}")
@@ -97,11 +345,10 @@ def get_all_symbols():
         return []
 
     try:
-        symbols = mt5.symbols_get()
-        if symbols is None:
+        symbol_names = _get_symbol_names()
+        if symbol_names is None:
             return []
-        symbol_names = [s.name for s in symbols]
-        return symbol_names
+        return list(symbol_names)
     except Exception as e:
         print(f"❌ Ошибка при получении списка символов: {e}")
         return []
@@ -110,39 +357,35 @@ def get_all_symbols():
 def get_symbol_info(symbol):
     """
     Получает информацию о конкретном символе
+
+    Статические параметры берутся из кэша get_static_symbol_info,
+    у терминала запрашивается только текущий тик (bid/ask)
     """
     if not HAS_MT5:
         return None
 
-    try:
-        symbol_info = mt5.symbol_info(symbol)
-        if symbol_info is None:
-            print(f"❌ Символ {symbol} не найден")
-            return None
+    # Недавно не найденный символ не запрашиваем у терминала повторно
+    expires_at = _SYMBOL_NEG_CACHE.get(symbol)
+    if expires_at is not None and expires_at > time.monotonic():
+        return None
 
-        # Безопасное получение атрибутов
-        info_dict = {
-            'name': symbol_info.name,
-            'bid': getattr(symbol_info, 'bid', 0),
-            'ask': getattr(symbol_info, 'ask', 0),
-            'spread': getattr(symbol_info, 'spread', 0),
-            'digits': getattr(symbol_info, 'digits', 5),
-            'trade_mode': getattr(symbol_info, 'trade_mode', 0),
-            'point': getattr(symbol_info, 'point', 0.00001),
-            'trade_stops_level': getattr(symbol_info, 'trade_stops_level', 0),
-            'trade_contract_size': getattr(symbol_info, 'trade_contract_size', 100000),
-            'currency_base': getattr(symbol_info, 'currency_base', ''),
-            'currency_profit': getattr(symbol_info, 'currency_profit', ''),
-            'currency_margin': getattr(symbol_info, 'currency_margin', ''),
-        }
+    static_info = get_static_symbol_info(symbol)
+    if static_info is None:
+        _SYMBOL_NEG_CACHE[symbol] = time.monotonic() + _SYMBOL_NEG_CACHE_TTL
+        return None
+
+    _SYMBOL_NEG_CACHE.pop(symbol, None)
 
-        # Вычисляем спред, если он не доступен напрямую
-        if info_dict['spread'] == 0 and info_dict['ask'] > 0 and info_dict['bid'] > 0:
-            info_dict['spread'] = info_dict['ask'] - info_dict['bid']
+    try:
+        # Для символа вне Market Watch тика нет - цены остаются нулевыми, как в SymbolInfo
+        tick = mt5.symbol_info_tick(symbol)
+        bid, ask = (tick.bid, tick.ask) if tick is not None else (0, 0)
 
-        # Проверяем доступность торговли
-        trade_mode = info_dict['trade_mode']
-        info_dict['trade_allowed'] = trade_mode != 0  # 0 = SYMBOL_TRADE_MODE_DISABLED
+        info_dict = static_info._asdict()
+        info_dict['bid'] = bid
+        info_dict['ask'] = ask
+        # Спред в пунктах, как в SymbolInfo.spread
+        info_dict['spread'] = round((ask - bid) / static_info.point) if static_info.point else 0
 
         return info_dict
 
@@ -151,9 +394,163 @@ def get_symbol_info(symbol):
         return None
 
 
-def load_data(symbol, timeframe="M15", bars_count=2000, timeframe_str=None):
+@lru_cache(maxsize=64)
+def _cached_symbol_info(symbol, time_bucket):
+    return get_symbol_info(symbol)
+
+
+def get_symbol_info_cached(symbol):
+    """
+    Получает информацию о символе с кэшированием на 1 секунду
+    """
+    return _cached_symbol_info(symbol, int(time.time()))
+
+
+def _rates_to_dataframe(rates):
+    """
+    Конвертация структурированного массива баров MT5 в DataFrame с индексом по времени
+    """
+    # Колонки берутся как срезы структурированного массива,
+    # индекс строится сразу из секунд epoch без промежуточной колонки
+    index = pd.DatetimeIndex(rates['time'].astype('datetime64[s]'), name='time')
+    return pd.DataFrame({name: rates[name] for name in rates.dtype.names if name != 'time'},
+                        index=index, copy=False)
+
+
+def _copy_rates(symbol, timeframe_num, count):
+    """
+    Последние count баров символа в виде DataFrame (None, если терминал не вернул данных)
+    """
+    rates = mt5.copy_rates_from_pos(symbol, timeframe_num, 0, count)
+    if rates is None or len(rates) == 0:
+        return None
+    return _rates_to_dataframe(rates)
+
+
+def _update_cached_bars(symbol, timeframe_num, bars_count, counts=(_POLL_BARS, _INCREMENTAL_BARS)):
+    """
+    Дозагрузка последних баров к кэшированным данным
+
+    Возвращает None, если кэш не покрывает запрос или с момента прошлой загрузки
+    появилось больше баров, чем дозагружается (нужна полная загрузка)
+    """
+    cached = _BAR_CACHE.get((symbol, timeframe_num))
+    if cached is None or len(cached) < bars_count:
+        return None
+
+    # Нужны бары, начиная с последнего кэшированного (он мог быть незакрытым)
+    for count in counts:
+        recent = _copy_rates(symbol, timeframe_num, count)
+        if recent is None:
+            return None
+        if recent.index[0] <= cached.index[-1]:
+            break
+    else:
+        return None
+
+    # Последний кэшированный бар мог быть незакрытым - заменяем пересекающиеся бары свежими
+    merged = pd.concat([cached[cached.index < recent.index[0]], recent]).iloc[-len(cached):]
+    _BAR_CACHE[(symbol, timeframe_num)] = merged
+    return merged
+
+
+def _select_symbol(symbol):
+    """
+    Добавление символа в Market Watch (один раз за сессию)
+    """
+    if symbol in _SELECTED_SYMBOLS:
+        return True
+    if not mt5.symbol_select(symbol, True):
+        print(f"❌ Символ {symbol} не доступен для торговли")
+        return False
+    _SELECTED_SYMBOLS.add(symbol)
+    return True
+
+
+def _disk_cache_path(symbol, timeframe):
+    """
+    Путь к файлу кэша баров для текущего счета (None, если счет неизвестен)
+    """
+    account_info = mt5.account_info()
+    if account_info is None:
+        return None
+
+    account_dir = re.sub(r'[^\w.-]', '_', f"{account_info.server}_{account_info.login}")
+    return os.path.join(_DISK_CACHE_DIR, account_dir, f"{symbol}_{timeframe}.parquet")
+
+
+def _load_disk_bars(symbol, timeframe, timeframe_num, bars_count):
+    """
+    Загрузка баров из дискового кэша с дозагрузкой новых баров из терминала
+
+    Возвращает None, если файла нет, он короче запроса или разрыв слишком велик
+    """
+    path = _disk_cache_path(symbol, timeframe)
+    if path is None or not os.path.exists(path):
+        return None
+
+    try:
+        _BAR_CACHE[(symbol, timeframe_num)] = pd.read_parquet(path, engine='pyarrow')
+    except Exception as e:
+        logger.debug("Не удалось прочитать кэш баров %s: %s", path, e)
+        return None
+
+    counts = tuple(count for count in _DISK_CACHE_BARS if count < bars_count)
+    df = _update_cached_bars(symbol, timeframe_num, bars_count, counts)
+    if df is None:
+        _BAR_CACHE.pop((symbol, timeframe_num), None)
+        return None
+
+    _save_disk_bars(symbol, timeframe, df)
+    return df
+
+
+def _save_disk_bars(symbol, timeframe, df):
+    """
+    Сохранение баров в дисковый кэш (ошибки записи не прерывают загрузку)
+    """
+    path = _disk_cache_path(symbol, timeframe)
+    if path is None:
+        return
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_parquet(path, engine='pyarrow', compression='snappy')
+    except Exception as e:
+        logger.debug("Не удалось сохранить кэш баров для %s: %s", symbol, e)
+
+
+def _float32_exact(symbol, df):
+    """
+    Цены символа представимы в float32 без потери точности до пункта
+    """
+    static_info = get_static_symbol_info(symbol)
+    if static_info is None:
+        return False
+    return df['high'].max() * 10 ** static_info.digits < _FLOAT32_EXACT_LIMIT
+
+
+def _select_bars(symbol, df, bars_count, float32):
+    """
+    Последние bars_count баров, при необходимости с ценами в float32 и сжатыми объемами
+    """
+    df = df.iloc[-bars_count:]
+    if float32 and _float32_exact(symbol, df):
+        df = df.astype(_FLOAT32_PRICES)
+        for column in ('tick_volume', 'real_volume'):
+            df[column] = pd.to_numeric(df[column], downcast='unsigned')
+    return df
+
+
+def load_data(symbol, timeframe="M15", bars_count=2000, timeframe_str=None, float32=False,
+              disk_cache=False):
     """
     Загрузка исторических данных для указанного символа
+
+    При float32=True цены OHLC возвращаются в float32, объемы - в минимальном беззнаковом типе
+    (кэш баров остается в float64; для цен, не помещающихся в float32 до пункта, приведение пропускается).
+    При disk_cache=True (нужен pyarrow) история сохраняется в cache/*.parquet и после
+    перезапуска из терминала дозагружаются только новые бары
     """
     if not HAS_MT5:
         return pd.DataFrame()
@@ -164,38 +561,39 @@ def load_data(symbol, timeframe="M15", bars_count=2000, timeframe_str=None):
             timeframe = timeframe_str
 
         # Конвертируем строковый таймфрейм в числовой
-        timeframe_map = {
-            'M1': mt5.TIMEFRAME_M1,
-            'M5': mt5.TIMEFRAME_M5,
-            'M15': mt5.TIMEFRAME_M15,
-            'M30': mt5.TIMEFRAME_M30,
-            'H1': mt5.TIMEFRAME_H1,
-            'H4': mt5.TIMEFRAME_H4,
-            'D1': mt5.TIMEFRAME_D1,
-            'W1': mt5.TIMEFRAME_W1,
-            'MN1': mt5.TIMEFRAME_MN1
-        }
-
-        timeframe_num = timeframe_map.get(timeframe, mt5.TIMEFRAME_M15)
+        timeframe_num = _TIMEFRAME_MAP.get(timeframe, mt5.TIMEFRAME_M15)
 
-        # Проверяем, что символ доступен
-        if not mt5.symbol_select(symbol, True):
-            print(f"❌ Символ {symbol} не доступен для торговли")
+        # Проверяем, что символ доступен (добавление в Market Watch - один раз за сессию)
+        if not _select_symbol(symbol):
             return pd.DataFrame()
 
+        # Если данные уже загружались, дозагружаем только последние бары
+        df = _update_cached_bars(symbol, timeframe_num, bars_count)
+
+        use_disk = disk_cache and HAS_PYARROW
+        if df is None and use_disk and (symbol, timeframe_num) not in _BAR_CACHE:
+            df = _load_disk_bars(symbol, timeframe, timeframe_num, bars_count)
+
+        if df is not None:
+            df = _select_bars(symbol, df, bars_count, float32)
+            logger.debug("Обновлено %d баров для %s: %s - %s", len(df), symbol, df.index[0], df.index[-1])
+            return df
+
         print(f"🔍 Загрузка данных для {symbol} (таймфрейм: {timeframe}, баров: {bars_count})")
 
-        # Загрузка данных
-        rates = mt5.copy_rates_from(symbol, timeframe_num, datetime.now(), bars_count)
+        # Последние bars_count баров с хвоста истории, без поиска по времени
+        df = _copy_rates(symbol, timeframe_num, bars_count)
 
-        if rates is None or len(rates) == 0:
+        if df is None:
+            # Символ могли убрать из Market Watch - при следующем вызове выбираем его заново
+            _SELECTED_SYMBOLS.discard(symbol)
             print(f"❌ Не удалось загрузить данные для {symbol}")
             return pd.DataFrame()
 
-        # Конвертируем в DataFrame
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        df.set_index('time', inplace=True)
+        _BAR_CACHE[(symbol, timeframe_num)] = df
+        if use_disk:
+            _save_disk_bars(symbol, timeframe, df)
+        df = _select_bars(symbol, df, bars_count, float32)
 
         print(f"✅ Загружено {len(df)} баров для {symbol}")
         print(f"📅 Период данных: {df.index[0]} - {df.index[-1]}")
@@ -204,46 +602,126 @@ def load_data(symbol, timeframe="M15", bars_count=2000, timeframe_str=None):
 
     except Exception as e:
         print(f"❌ Ошибка загрузки данных для {symbol}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.debug("Трассировка ошибки загрузки данных для %s", symbol, exc_info=True)
         return pd.DataFrame()
 
 
 def get_current_price(symbol):
     """
-    Получает текущую цену для символа
+    Получает текущую цену для символа (bid, ask)
+
+    Повторные запросы в пределах _TICK_CACHE_TTL секунд не обращаются к терминалу
     """
     if not HAS_MT5:
         return None, None
 
+    # Котировка, полученная в пределах _TICK_CACHE_TTL, используется повторно
+    cached = _TICK_CACHE.get(symbol)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1], cached[2]
+
     try:
         tick = mt5.symbol_info_tick(symbol)
         if tick is None:
             return None, None
 
+        _TICK_CACHE[symbol] = (time.monotonic() + _TICK_CACHE_TTL, tick.bid, tick.ask)
         return tick.bid, tick.ask
     except Exception as e:
         print(f"❌ Ошибка получения цены для {symbol}: {e}")
         return None, None
 
 
-def check_trading_allowed(symbol):
+def _to_static_info_safe(symbol_info):
     """
-    Проверяет, разрешена ли торговля для символа
+    Статические параметры с безопасным получением атрибутов (значения по умолчанию)
+    """
+    trade_mode = getattr(symbol_info, 'trade_mode', 0)
+    return StaticSymbolInfo(
+        name=symbol_info.name,
+        digits=getattr(symbol_info, 'digits', 5),
+        point=getattr(symbol_info, 'point', 0.00001),
+        trade_mode=trade_mode,
+        trade_allowed=trade_mode != 0,  # 0 = SYMBOL_TRADE_MODE_DISABLED
+        trade_stops_level=getattr(symbol_info, 'trade_stops_level', 0),
+        trade_contract_size=getattr(symbol_info, 'trade_contract_size', 100000),
+        currency_base=getattr(symbol_info, 'currency_base', ''),
+        currency_profit=getattr(symbol_info, 'currency_profit', ''),
+        currency_margin=getattr(symbol_info, 'currency_margin', ''),
+    )
+
+
+def _to_static_info(symbol_info):
+    """
+    Статические параметры из SymbolInfo MT5
+    """
+    # Все поля есть в SymbolInfo MT5 - читаем напрямую, значения по умолчанию только при их отсутствии
+    try:
+        return StaticSymbolInfo(
+            name=symbol_info.name,
+            digits=symbol_info.digits,
+            point=symbol_info.point,
+            trade_mode=symbol_info.trade_mode,
+            trade_allowed=symbol_info.trade_mode != 0,  # 0 = SYMBOL_TRADE_MODE_DISABLED
+            trade_stops_level=symbol_info.trade_stops_level,
+            trade_contract_size=symbol_info.trade_contract_size,
+            currency_base=symbol_info.currency_base,
+            currency_profit=symbol_info.currency_profit,
+            currency_margin=symbol_info.currency_margin,
+        )
+    except AttributeError:
+        return _to_static_info_safe(symbol_info)
+
+
+def get_static_symbol_info(symbol):
+    """
+    Получает статические параметры символа (запрос к MT5 не чаще раза в _STATIC_INFO_TTL секунд)
     """
     if not HAS_MT5:
-        return False
+        return None
+
+    cached = _STATIC_INFO.get(symbol)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
 
     try:
-        # Проверяем информацию о символе
         symbol_info = mt5.symbol_info(symbol)
         if symbol_info is None:
             print(f"❌ Символ {symbol} не найден")
-            return False
+            return None
+
+        static_info = _to_static_info(symbol_info)
+        _STATIC_INFO[symbol] = (static_info, time.monotonic() + _STATIC_INFO_TTL)
+        return static_info
+
+    except Exception as e:
+        print(f"❌ Ошибка получения информации о символе {symbol}: {e}")
+        return None
+
+
+def check_trading_allowed(symbol, symbol_info=None):
+    """
+    Проверяет, разрешена ли торговля для символа
+
+    Если передан symbol_info (словарь из get_symbol_info), используется он,
+    иначе - кэшированные статические параметры символа
+    """
+    if not HAS_MT5:
+        return False
+
+    try:
+        # Проверяем информацию о символе
+        if symbol_info is not None:
+            trade_allowed = symbol_info['trade_allowed']
+        else:
+            static_info = get_static_symbol_info(symbol)
+            if static_info is None:
+                return False
+            trade_allowed = static_info.trade_allowed
 
         # Проверяем, разрешена ли торговля
-        if symbol_info.trade_mode != 0:  # 0 = SYMBOL_TRADE_MODE_DISABLED
-            print(f"✅ Торговля разрешена для {symbol}")
+        if trade_allowed:
+            logger.debug("Торговля разрешена для %s", symbol)
             return True
         else:
             print(f"❌ Торговля запрещена для {symbol}")
@@ -254,7 +732,35 @@ def check_trading_allowed(symbol):
         return False
 
 
-def place_order_simple(symbol, order_type, lot_size):
+def _pip_size(point, digits):
+    """
+    Размер пипса: 10 пунктов для котировок с 3/5 знаками (EURUSD 0.0001, USDJPY 0.01), иначе 1 пункт
+    """
+    return point * 10 if digits in (3, 5) else point
+
+
+def _prepare_order(symbol, order_type, symbol_info=None):
+    """
+    Общая подготовка ордера: проверка торговли и одна текущая котировка
+
+    Возвращает (цена, тип ордера MT5, направление) или None, если ордер отправлять нельзя.
+    Без symbol_info проверка идет по кэшу статических параметров, без обращения к терминалу
+    """
+    # Проверяем, разрешена ли торговля
+    if not check_trading_allowed(symbol, symbol_info):
+        return None
+
+    # Получаем текущую цену
+    tick = mt5.symbol_info_tick(symbol)
+    if tick is None:
+        print(f"❌ Не удалось получить текущие цены для {symbol}")
+        return None
+
+    order_type_mt5, price_field, direction = _ORDER_SIDES.get(order_type, _ORDER_SIDES['sell'])
+    return getattr(tick, price_field), order_type_mt5, direction
+
+
+def place_order_simple(symbol, order_type, lot_size, symbol_info=None):
     """
     Простое размещение ордера БЕЗ стоп-лосса и тейк-профита
     """
@@ -262,44 +768,29 @@ def place_order_simple(symbol, order_type, lot_size):
         return False
 
     try:
-        # Проверяем, разрешена ли торговля
-        if not check_trading_allowed(symbol):
-            return False
-
-        # Получаем текущую цену
-        bid, ask = get_current_price(symbol)
-        if bid is None or ask is None:
-            print(f"❌ Не удалось получить текущие цены для {symbol}")
+        context = _prepare_order(symbol, order_type, symbol_info)
+        if context is None:
             return False
-
-        # Определяем параметры ордера
-        if order_type == 'buy':
-            price = ask
-            order_type_mt5 = mt5.ORDER_TYPE_BUY
-        else:  # sell
-            price = bid
-            order_type_mt5 = mt5.ORDER_TYPE_SELL
+        price, order_type_mt5, _ = context
 
         # Подготавливаем простой запрос БЕЗ SL/TP
         request = {
-            "action": mt5.TRADE_ACTION_DEAL,
+            **_ORDER_TEMPLATE,
             "symbol": symbol,
             "volume": lot_size,
             "type": order_type_mt5,
             "price": price,
-            "deviation": 20,
-            "magic": 234000,
             "comment": "AI Trader Simple",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
         }
 
-        print(f"🔧 Отправка ордера: {order_type.upper()} {symbol} {lot_size} лотов")
-        print(f"   💰 Цена: {price:.5f}")
+        logger.debug("Отправка ордера: %s %s %s лотов, цена: %.5f", order_type.upper(), symbol, lot_size, price)
 
         # Отправляем ордер
         result = mt5.order_send(request)
 
+        # Состояние символа могло измениться после сделки
+        _cached_symbol_info.cache_clear()
+
         # Проверяем, что результат не None
         if result is None:
             print(f"❌ MT5 вернул None при отправке ордера")
@@ -317,12 +808,11 @@ def place_order_simple(symbol, order_type, lot_size):
 
     except Exception as e:
         print(f"❌ Исключение при размещении ордера для {symbol}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.debug("Трассировка ошибки ордера для %s", symbol, exc_info=True)
         return False
 
 
-def place_order_with_sltp(symbol, order_type, lot_size, stop_loss_pips, take_profit_pips):
+def place_order_with_sltp(symbol, order_type, lot_size, stop_loss_pips, take_profit_pips, symbol_info=None):
     """
     Размещение ордера со стоп-лоссом и тейк-профитом (в пипсах)
     """
@@ -330,57 +820,44 @@ def place_order_with_sltp(symbol, order_type, lot_size, stop_loss_pips, take_pro
         return False
 
     try:
-        # Проверяем, разрешена ли торговля
-        if not check_trading_allowed(symbol):
+        context = _prepare_order(symbol, order_type, symbol_info)
+        if context is None:
             return False
+        price, order_type_mt5, direction = context
 
-        # Получаем текущую цену
-        bid, ask = get_current_price(symbol)
-        if bid is None or ask is None:
-            print(f"❌ Не удалось получить текущие цены для {symbol}")
-            return False
-
-        # Получаем информацию о символе
-        symbol_info = get_symbol_info(symbol)
-        if not symbol_info:
-            return False
+        # Размер пипса и точность цены символа
+        if symbol_info is not None:
+            point, digits = symbol_info['point'], symbol_info['digits']
+        else:
+            static_info = get_static_symbol_info(symbol)
+            point, digits = static_info.point, static_info.digits
+        pip = _pip_size(point, digits)
 
-        # Определяем параметры ордера
-        if order_type == 'buy':
-            price = ask
-            order_type_mt5 = mt5.ORDER_TYPE_BUY
-            # Для BUY: SL ниже цены, TP выше цены
-            sl = price - (stop_loss_pips * 0.0001) if stop_loss_pips > 0 else 0
-            tp = price + (take_profit_pips * 0.0001) if take_profit_pips > 0 else 0
-        else:  # sell
-            price = bid
-            order_type_mt5 = mt5.ORDER_TYPE_SELL
-            # Для SELL: SL выше цены, TP ниже цены
-            sl = price + (stop_loss_pips * 0.0001) if stop_loss_pips > 0 else 0
-            tp = price - (take_profit_pips * 0.0001) if take_profit_pips > 0 else 0
+        # Определяем уровни SL/TP: для BUY SL ниже цены и TP выше, для SELL наоборот
+        sl = round(price - direction * stop_loss_pips * pip, digits) if stop_loss_pips > 0 else 0
+        tp = round(price + direction * take_profit_pips * pip, digits) if take_profit_pips > 0 else 0
 
         # Подготавливаем запрос с SL/TP
         request = {
-            "action": mt5.TRADE_ACTION_DEAL,
+            **_ORDER_TEMPLATE,
             "symbol": symbol,
             "volume": lot_size,
             "type": order_type_mt5,
             "price": price,
             "sl": sl,
             "tp": tp,
-            "deviation": 20,
-            "magic": 234000,
             "comment": "AI Trader SL/TP",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
         }
 
-        print(f"🔧 Отправка ордера: {order_type.upper()} {symbol} {lot_size} лотов")
-        print(f"   💰 Цена: {price:.5f}, SL: {sl:.5f}, TP: {tp:.5f}")
+        logger.debug("Отправка ордера: %s %s %s лотов, цена: %.5f, SL: %.5f, TP: %.5f",
+                     order_type.upper(), symbol, lot_size, price, sl, tp)
 
         # Отправляем ордер
         result = mt5.order_send(request)
 
+        # Состояние символа могло измениться после сделки
+        _cached_symbol_info.cache_clear()
+
         # Проверяем, что результат не None
         if result is None:
             print(f"❌ MT5 вернул None при отправке ордера")
@@ -397,8 +874,7 @@ def place_order_with_sltp(symbol, order_type, lot_size, stop_loss_pips, take_pro
 
     except Exception as e:
         print(f"❌ Исключение при размещении ордера для {symbol}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.debug("Трассировка ошибки ордера для %s", symbol, exc_info=True)
         return False
 
 
@@ -408,104 +884,134 @@ def place_order(symbol, order_type, lot_size, stop_loss=0.0, take_profit=0.0):
     """
     # Если указаны стоп-лосс и тейк-профит, используем функцию с SL/TP
     if stop_loss > 0 or take_profit > 0:
-        # Конвертируем в пипсы (предполагаем, что stop_loss и take_profit в цене)
-        stop_loss_pips = int(stop_loss / 0.0001) if stop_loss > 0 else 0
-        take_profit_pips = int(take_profit / 0.0001) if take_profit > 0 else 0
+        static_info = get_static_symbol_info(symbol)
+        if static_info is None:
+            return False
+
+        # Конвертируем в пипсы символа (предполагаем, что stop_loss и take_profit в цене)
+        pip = _pip_size(static_info.point, static_info.digits)
+        stop_loss_pips = round(stop_loss / pip) if stop_loss > 0 else 0
+        take_profit_pips = round(take_profit / pip) if take_profit > 0 else 0
         return place_order_with_sltp(symbol, order_type, lot_size, stop_loss_pips, take_profit_pips)
     else:
         # Используем простую функцию без SL/TP
         return place_order_simple(symbol, order_type, lot_size)
 
 
+def wait_for_positions(symbol, count, timeout=2.0):
+    """
+    Ожидание, пока по символу откроется не менее count позиций
+
+    Терминал опрашивается с нарастающим интервалом вместо фиксированной паузы.
+    Возвращает False, если позиции не появились за timeout секунд
+    """
+    if not HAS_MT5:
+        return False
+
+    deadline = time.monotonic() + timeout
+    delay = 0.02
+    while True:
+        positions = mt5.positions_get(symbol=symbol)
+        if positions is not None and len(positions) >= count:
+            return True
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 1.7, 0.25)
+
+
 def get_error_description(error_code):
     """
     Получение описания ошибки MT5 по коду
     """
-    error_descriptions = {
-        10000: "TRADE_RETCODE_REQUOTE - Требуется перекотировка",
-        10001: "TRADE_RETCODE_REJECT - Запрос отклонен",
-        10002: "TRADE_RETCODE_CANCEL - Запрос отменен",
-        10003: "TRADE_RETCODE_PLACED - Ордер размещен",
-        10004: "TRADE_RETCODE_DONE - Сделка исполнена",
-        10005: "TRADE_RETCODE_DONE_PARTIAL - Сделка исполнена частично",
-        10006: "TRADE_RETCODE_ERROR - Ошибка обработки запроса",
-        10007: "TRADE_RETCODE_TIMEOUT - Запрос отменен по таймауту",
-        10008: "TRADE_RETCODE_INVALID - Неверный запрос",
-        10009: "TRADE_RETCODE_INVALID_VOLUME - Неверный объем",
-        10010: "TRADE_RETCODE_INVALID_PRICE - Неверная цена",
-        10011: "TRADE_RETCODE_INVALID_STOPS - Неверные стопы",
-        10012: "TRADE_RETCODE_TRADE_DISABLED - Торговля запрещена",
-        10013: "TRADE_RETCODE_MARKET_CLOSED - Рынок закрыт",
-        10014: "TRADE_RETCODE_NO_MONEY - Недостаточно средств",
-        10015: "TRADE_RETCODE_PRICE_CHANGED - Цена изменилась",
-        10016: "TRADE_RETCODE_PRICE_OFF - Нет котировок",
-        10017: "TRADE_RETCODE_INVALID_EXPIRATION - Неверная дата экспирации",
-        10018: "TRADE_RETCODE_ORDER_CHANGED - Ордер изменен",
-        10019: "TRADE_RETCODE_TOO_MANY_REQUESTS - Слишком много запросов",
-        10020: "TRADE_RETCODE_NO_CHANGES - Нет изменений",
-        10021: "TRADE_RETCODE_SERVER_DISABLES_AT - Автотрейдинг запрещен сервером",
-        10022: "TRADE_RETCODE_CLIENT_DISABLES_AT - Автотрейдинг запрещен клиентом",
-        10023: "TRADE_RETCODE_LOCKED - Запрос заблокирован",
-        10024: "TRADE_RETCODE_FROZEN - Ордер или позиция заморожены",
-        10025: "TRADE_RETCODE_INVALID_FILL - Неверный тип исполнения",
-        10026: "TRADE_RETCODE_CONNECTION - Нет соединения с торговым сервером",
-        10027: "TRADE_RETCODE_ONLY_REAL - Разрешена только реальная торговля",
-        10028: "TRADE_RETCODE_LIMIT_ORDERS - Достигнут лимит ордеров",
-        10029: "TRADE_RETCODE_LIMIT_VOLUME - Достигнут лимит объема",
-        10030: "TRADE_RETCODE_INVALID_ORDER - Неверный ордер",
-        10031: "TRADE_RETCODE_POSITION_CLOSED - Позиция уже закрыта",
-        10032: "TRADE_RETCODE_INVALID_CLOSE_VOLUME - Неверный объем для закрытия",
-        10033: "TRADE_RETCODE_CLOSE_ORDER_EXIST - Уже есть ордер на закрытие",
-        10034: "TRADE_RETCODE_LIMIT_POSITIONS - Достигнут лимит позиций",
-    }
-
-    return error_descriptions.get(error_code, f"Неизвестная ошибка: {error_code}")
+    return _ERROR_DESCRIPTIONS.get(error_code, f"Неизвестная ошибка: {error_code}")
 
 
 def close_all_orders(symbol=None):
     """
     Закрытие всех ордеров (для указанного символа или всех)
     """
+    return close_positions([symbol] if symbol else None)
+
+
+def close_positions(symbols=None):
+    """
+    Закрытие позиций по списку символов (None - все позиции)
+
+    Позиции запрашиваются у терминала одним вызовом и фильтруются на стороне Python
+    """
     if not HAS_MT5:
         return False
 
     try:
-        orders = mt5.positions_get(symbol=symbol) if symbol else mt5.positions_get()
-
-        if orders is None:
-            print("✅ Нет открытых ордеров для закрытия")
-            return True
-
-        closed_count = 0
-        for order in orders:
-            # Определяем тип закрывающей сделки
-            close_type = mt5.ORDER_TYPE_SELL if order.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY
-
-            close_request = {
-                "action": mt5.TRADE_ACTION_DEAL,
-                "position": order.ticket,
-                "symbol": order.symbol,
-                "volume": order.volume,
-                "type": close_type,
-                "price": mt5.symbol_info_tick(
-                    order.symbol).bid if close_type == mt5.ORDER_TYPE_SELL else mt5.symbol_info_tick(order.symbol).ask,
-                "deviation": 20,
-                "magic": 234000,
-                "comment": "Close AI",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
-            }
-
-            result = mt5.order_send(close_request)
-            if result and result.retcode == mt5.TRADE_RETCODE_DONE:
-                closed_count += 1
-                print(f"✅ Закрыт ордер {order.ticket} для {order.symbol}")
+        with _CLOSE_LOCK:
+            if symbols is None:
+                orders = mt5.positions_get()
+            elif len(symbols) == 1:
+                orders = mt5.positions_get(symbol=next(iter(symbols)))
             else:
-                error_msg = get_error_description(result.retcode) if result else "None result"
-                print(f"❌ Ошибка закрытия ордера {order.ticket}: {error_msg}")
-
-        print(f"📊 Закрыто ордеров: {closed_count}/{len(orders)}")
-        return closed_count == len(orders)
+                symbols_set = frozenset(symbols)
+                orders = [p for p in mt5.positions_get() or () if p.symbol in symbols_set]
+
+            if not orders:
+                print("✅ Нет открытых ордеров для закрытия")
+                return True
+
+            symbols = list({order.symbol for order in orders})
+
+            # Котировки (по одной на символ) и закрывающие запросы отправляются через общий пул,
+            # чтобы задержки терминала не суммировались
+            with ThreadPoolExecutor(max_workers=min(_CLOSE_WORKERS, len(orders))) as executor:
+                ticks = dict(zip(symbols, executor.map(lambda s: call_limited(mt5.symbol_info_tick, s), symbols)))
+
+                # Позиции без котировок не отправляются и попадают в общий отчет
+                failed = [(order, f"нет котировок для {order.symbol}")
+                          for order in orders if ticks[order.symbol] is None]
+
+                # Тип закрывающей сделки и цена берутся из таблицы по типу позиции
+                close_requests = [
+                    (order, {
+                        **_ORDER_TEMPLATE,
+                        "position": order.ticket,
+                        "symbol": order.symbol,
+                        "volume": order.volume,
+                        "type": _CLOSE_SIDES[order.type][0],
+                        "price": getattr(ticks[order.symbol], _CLOSE_SIDES[order.type][1]),
+                        "comment": "Close AI",
+                    })
+                    for order in orders if ticks[order.symbol] is not None
+                ]
+
+                results = list(executor.map(lambda request: call_limited(mt5.order_send, request),
+                                            [request for _, request in close_requests]))
+
+            # Брокер может ограничивать частоту запросов - такие повторяем последовательно,
+            # с ценой из свежей котировки (первая могла устареть за время параллельной отправки)
+            for i, ((order, request), result) in enumerate(zip(close_requests, results)):
+                if result and result.retcode == mt5.TRADE_RETCODE_TOO_MANY_REQUESTS:
+                    tick = mt5.symbol_info_tick(order.symbol)
+                    results[i] = mt5.order_send(
+                        {**request, "price": getattr(tick, _CLOSE_SIDES[order.type][1])}
+                    ) if tick is not None else None
+
+            # Отчет формируется после всех отправок и выводится одной записью
+            closed = [order for (order, _), result in zip(close_requests, results)
+                      if result and result.retcode == mt5.TRADE_RETCODE_DONE]
+            failed.extend(
+                (order, get_error_description(result.retcode) if result else 'None result')
+                for (order, _), result in zip(close_requests, results)
+                if not (result and result.retcode == mt5.TRADE_RETCODE_DONE)
+            )
+
+            lines = [f"✅ Закрыт ордер {order.ticket} для {order.symbol}" for order in closed]
+            lines.extend(f"❌ Ошибка закрытия ордера {order.ticket}: {reason}" for order, reason in failed)
+            lines.append(f"📊 Закрыто ордеров: {len(closed)}/{len(orders)}")
+            print('\n'.join(lines))
+
+            return len(closed) == len(orders)
 
     except Exception as e:
         print(f"❌ Ошибка при закрытии ордеров: {e}")
@@ -23,40 +23,37 @@ class MT5ClientMock:
         # Создаем тестовые данные
         dates = pd.date_range(end=datetime.now(), periods=bars, freq='15min')
 
-        # Генерируем реалистичные ценовые данные
-        np.random.seed(42)
-        prices = []
-        current_price = 1.1000  # Начальная цена EURUSD
-
-        for i in range(bars):
-            # Добавляем случайное движение
-            change = np.random.normal(0, 0.0005)
-            current_price += change
-
-            # Создаем свечу
-            open_price = current_price
-            high_price = open_price + abs(np.random.normal(0, 0.001))
-            low_price = open_price - abs(np.random.normal(0, 0.001))
-            close_price = open_price + np.random.normal(0, 0.0003)
-
-            # Обеспечиваем корректность high/low
-            high_price = max(open_price, close_price, high_price)
-            low_price = min(open_price, close_price, low_price)
-
-            prices.append({
-                'time': dates[i].timestamp(),
-                'open': open_price,
-                'high': high_price,
-                'low': low_price,
-                'close': close_price,
-                'tick_volume': np.random.randint(100, 1000),
-                'spread': np.random.randint(1, 10),
-                'real_volume': np.random.randint(1000, 10000)
-            })
-
-        df = pd.DataFrame(prices)
-        df['datetime'] = pd.to_datetime(df['time'], unit='s')
-        df.set_index('datetime', inplace=True)
+        # Генерируем реалистичные ценовые данные сразу по колонкам (без цикла по барам)
+        rng = np.random.default_rng(42)
+        changes = rng.normal(0, 0.0005, bars)
+        high_offsets = np.abs(rng.normal(0, 0.001, bars))
+        low_offsets = np.abs(rng.normal(0, 0.001, bars))
+        close_offsets = rng.normal(0, 0.0003, bars)
+
+        # Случайное блуждание от начальной цены EURUSD
+        opens = 1.1000 + np.cumsum(changes)
+        closes = opens + close_offsets
+
+        # Обеспечиваем корректность high/low
+        highs = np.maximum(np.maximum(opens, closes), opens + high_offsets)
+        lows = np.minimum(np.minimum(opens, closes), opens - low_offsets)
+
+        tick_volumes = rng.integers(100, 1000, bars)
+        spreads = rng.integers(1, 10, bars)
+        real_volumes = rng.integers(1000, 10000, bars)
+
+        # DataFrame собирается из готовых массивов без промежуточных словарей по барам
+        times = ((dates - pd.Timestamp(0)) / pd.Timedelta(seconds=1)).to_numpy()
+        df = pd.DataFrame({
+            'time': times,
+            'open': opens,
+            'high': highs,
+            'low': lows,
+            'close': closes,
+            'tick_volume': tick_volumes,
+            'spread': spreads,
+            'real_volume': real_volumes
+        }, index=dates.rename('datetime'), copy=False)
 
         return df
 
@@ -1,9 +1,30 @@
-import time
+import threading
+import traceback
+import warnings
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from src.core.mt5_client import load_data, get_current_price, place_order
-from src.ml.feature_engineer import create_features
-from src.utils.config import get_symbol_specific_config
+from core import fast_ops
+from core.mt5_client import load_data, get_current_price, place_order
+from ml.feature_engineer import create_features
+from ml.model_builder import load_model_for_symbol
+from utils.config import get_symbol_specific_config
+
+# Флаг остановки торгового цикла (выставляется stop_trading, Ctrl+C и SIGTERM дают KeyboardInterrupt)
+SHUTDOWN = threading.Event()
+
+
+def _wait_for_shutdown(seconds):
+    """
+    Пауза до seconds секунд, прерываемая остановкой (True - остановка запрошена)
+
+    Ожидание идет отрезками по 1 с: на Windows Event.wait в главном потоке
+    не прерывается Ctrl+C, и KeyboardInterrupt доставляется между отрезками
+    """
+    for _ in range(int(seconds)):
+        if SHUTDOWN.wait(1):
+            return True
+    return SHUTDOWN.is_set()
 
 
 class Trader:
@@ -13,12 +34,14 @@ class Trader:
         self.symbol_config = get_symbol_specific_config(self.symbol, config)
 
         # Загрузка модели для конкретного символа
-        from src.ml.model_builder import load_model_for_symbol
         self.model = load_model_for_symbol(self.symbol)
 
         if not self.model:
             raise Exception(f"Модель для символа {self.symbol} не найдена")
 
+        # Ядра расчета признаков компилируются до первой итерации торгового цикла
+        fast_ops.warmup()
+
         print(f"✅ Трейдер инициализирован для {self.symbol}")
         print(f"⚙️ Настройки: Лот={self.symbol_config['lot_size']}, Макс. спред={self.symbol_config['max_spread']}")
 
@@ -30,7 +53,9 @@ class Trader:
             data = load_data(
                 symbol=self.symbol,
                 timeframe_str=self.config['data']['timeframe'],
-                bars_count=100  # Для торговли нужно меньше данных
+                bars_count=100,  # Для торговли нужно меньше данных
+                float32=self.config['data'].get('downcast_float32', False),
+                disk_cache=self.config['data'].get('disk_cache', False)
             )
 
             if data.empty:
@@ -60,23 +85,15 @@ class Trader:
                 print("❌ Нет данных для предсказания после создания признаков")
                 return None
 
-            # Берем последнюю строку для предсказания (исключая целевую колонку)
+            # Признаки для предсказания (исключая целевую колонку)
             exclude_cols = ['target']
             feature_cols = [col for col in features_df.columns if col not in exclude_cols]
-            latest_features = features_df[feature_cols].iloc[-1:]
-
-            # Проверяем на NaN
-            if latest_features.isnull().any().any():
-                print("❌ NaN значения в признаках для предсказания")
-                print(f"🔍 Проблемные колонки: {latest_features.columns[latest_features.isnull().any()].tolist()}")
-                return None
 
             # Проверяем, что все признаки совпадают с теми, на которых обучалась модель
             model_features = self.model.feature_names_in_
-            current_features = latest_features.columns
 
-            missing_features = set(model_features) - set(current_features)
-            extra_features = set(current_features) - set(model_features)
+            missing_features = set(model_features) - set(feature_cols)
+            extra_features = set(feature_cols) - set(model_features)
 
             if missing_features:
                 print(f"❌ Отсутствуют признаки, которые были при обучении: {missing_features}")
@@ -84,13 +101,27 @@ class Trader:
 
             if extra_features:
                 print(f"⚠️ Лишние признаки, которых не было при обучении: {extra_features}")
-                # Удаляем лишние признаки
-                latest_features = latest_features[model_features]
 
-            # Делаем предсказание
-            prediction = self.model.predict(latest_features)[0]
-            proba = self.model.predict_proba(latest_features)[0]
-            confidence = max(proba)
+            # Последняя строка в порядке признаков модели сразу в float32 -
+            # деревья sklearn все равно приводят вход к float32
+            latest_features = features_df.iloc[-1:][model_features].to_numpy(dtype=np.float32)
+
+            # Проверяем на NaN
+            nan_mask = np.isnan(latest_features[0])
+            if nan_mask.any():
+                print("❌ NaN значения в признаках для предсказания")
+                print(f"🔍 Проблемные колонки: {model_features[nan_mask].tolist()}")
+                return None
+
+            # Делаем предсказание: класс берется из тех же вероятностей,
+            # отдельный predict повторил бы проход по всем деревьям.
+            # Порядок колонок уже сверен с feature_names_in_, поэтому предупреждение
+            # sklearn о массиве без имен признаков подавляется
+            with warnings.catch_warnings():
+                warnings.filterwarnings('ignore', message='X does not have valid feature names')
+                proba = self.model.predict_proba(latest_features)[0]
+            prediction = self.model.classes_[proba.argmax()]
+            confidence = proba.max()
 
             print(f"🎯 Предсказание: {'BUY' if prediction == 1 else 'SELL'} (уверенность: {confidence:.2f})")
 
@@ -102,7 +133,6 @@ class Trader:
 
         except Exception as e:
             print(f"❌ Ошибка при создании предсказания: {e}")
-            import traceback
             traceback.print_exc()
             return None
 
@@ -198,7 +228,7 @@ class Trader:
 
         iteration = 0
         try:
-            while True:
+            while not SHUTDOWN.is_set():
                 iteration += 1
                 print(f"\n🔄 Итерация #{iteration} - {datetime.now().strftime('%H:%M:%S')}")
 
@@ -208,7 +238,7 @@ class Trader:
 
                     if data is None:
                         print("❌ Не удалось загрузить данные, повтор через 60 секунд...")
-                        time.sleep(60)
+                        _wait_for_shutdown(60)
                         continue
 
                     # Создаем предсказание
@@ -220,19 +250,25 @@ class Trader:
                     else:
                         print("❌ Не удалось создать предсказание")
 
-                    # Пауза между итерациями
+                    # Пауза между итерациями (прерывается сразу при остановке)
                     print(f"⏳ Ожидание 60 секунд до следующей итерации...")
-                    time.sleep(60)
+                    _wait_for_shutdown(60)
 
                 except Exception as e:
                     print(f"❌ Ошибка в итерации #{iteration}: {e}")
-                    import traceback
                     traceback.print_exc()
-                    time.sleep(10)
+                    _wait_for_shutdown(10)
+
+            print(f"\n⏹️ Остановка торговли для {self.symbol}")
 
         except KeyboardInterrupt:
             print(f"\n⏹️ Остановка торговли для {self.symbol}")
         except Exception as e:
             print(f"❌ Критическая ошибка в торговом цикле: {e}")
-            import traceback
             traceback.print_exc()
+
+    def stop_trading(self):
+        """
+        Запрос остановки торгового цикла из другого потока
+        """
+        SHUTDOWN.set()
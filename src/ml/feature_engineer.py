@@ -1,7 +1,13 @@
+import traceback
 import pandas as pd
 import numpy as np
 from typing import Optional
 
+from core import fast_ops
+
+# Признак выходного дня по номеру дня недели (0 - понедельник)
+_IS_WEEKEND = np.array([0, 0, 0, 0, 0, 1, 1])
+
 
 class FeatureEngineer:
     def __init__(self):
@@ -27,15 +33,18 @@ class FeatureEngineer:
             df['high_low_ratio'] = df['high'] / df['low']
             df['open_close_ratio'] = df['close'] / df['open']
 
-            # Простые скользящие средние
-            for window in [5, 10, 20, 50]:
-                df[f'sma_{window}'] = df['close'].rolling(window=window).mean()
-                df[f'sma_ratio_{window}'] = df['close'] / df[f'sma_{window}']
-                df[f'returns_sma_{window}'] = df['returns'].rolling(window=window).mean()
+            # Простые скользящие средние (все окна за один проход по колонке)
+            windows = [5, 10, 20, 50]
+            smas = self.calculate_smas(df['close'], windows)
+            returns_smas = self.calculate_smas(df['returns'], windows)
+            for window, sma, returns_sma in zip(windows, smas, returns_smas):
+                df[f'sma_{window}'] = sma
+                df[f'sma_ratio_{window}'] = df['close'] / sma
+                df[f'returns_sma_{window}'] = returns_sma
 
             # Экспоненциальные скользящие средние
             for span in [8, 13, 21]:
-                df[f'ema_{span}'] = df['close'].ewm(span=span).mean()
+                df[f'ema_{span}'] = self.calculate_ema(df['close'], span)
                 df[f'ema_ratio_{span}'] = df['close'] / df[f'ema_{span}']
 
             # RSI (Relative Strength Index)
@@ -49,21 +58,21 @@ class FeatureEngineer:
             df['macd_histogram'] = macd - signal
 
             # Bollinger Bands
-            bb_upper, bb_lower, bb_middle = self.calculate_bollinger_bands(df['close'])
+            bb_upper, bb_lower, bb_middle = self.calculate_bollinger_bands(df['close'], rolling_mean=df['sma_20'])
             df['bb_upper'] = bb_upper
             df['bb_lower'] = bb_lower
             df['bb_middle'] = bb_middle
             df['bb_position'] = (df['close'] - bb_lower) / (bb_upper - bb_lower)
 
-            # Волатильность
-            for window in [5, 10, 20]:
-                df[f'volatility_{window}'] = df['returns'].rolling(window=window).std()
+            # Волатильность (СКО доходностей по всем окнам за один вызов)
+            windows = [5, 10, 20]
+            for window, volatility in zip(windows, self.calculate_stds(df['returns'], windows)):
+                df[f'volatility_{window}'] = volatility
                 df[f'atr_{window}'] = self.calculate_atr(df, window)
 
             # Объемы
             if 'tick_volume' in df.columns:
-                df['volume_sma_5'] = df['tick_volume'].rolling(5).mean()
-                df['volume_sma_20'] = df['tick_volume'].rolling(20).mean()
+                df['volume_sma_5'], df['volume_sma_20'] = self.calculate_smas(df['tick_volume'], [5, 20])
                 df['volume_ratio'] = df['tick_volume'] / df['volume_sma_20']
 
             # Ценовые уровни
@@ -73,14 +82,14 @@ class FeatureEngineer:
             df['distance_to_support'] = (df['close'] - df['support']) / df['close']
 
             # Статистические фичи
-            df['rolling_skew_10'] = df['returns'].rolling(10).skew()
-            df['rolling_kurt_10'] = df['returns'].rolling(10).kurt()
+            df['rolling_skew_10'], df['rolling_kurt_10'] = self.calculate_skew_kurt(df['returns'], 10)
 
             # Временные фичи
             if hasattr(df.index, 'hour'):
+                day_of_week = df.index.dayofweek
                 df['hour'] = df.index.hour
-                df['day_of_week'] = df.index.dayofweek
-                df['is_weekend'] = df['day_of_week'].isin([5, 6]).astype(int)
+                df['day_of_week'] = day_of_week
+                df['is_weekend'] = _IS_WEEKEND[np.asarray(day_of_week)]
 
             # Целевая переменная (только для обучения)
             if for_training:
@@ -112,12 +121,42 @@ class FeatureEngineer:
 
         except Exception as e:
             print(f"❌ Ошибка создания признаков: {e}")
-            import traceback
             traceback.print_exc()
             return pd.DataFrame()
 
+    def calculate_smas(self, values: pd.Series, windows: list) -> list:
+        """Расчет SMA для нескольких окон"""
+        if fast_ops.HAS_NUMBA:
+            means = fast_ops.rolling_means(values.to_numpy(dtype=np.float64), np.asarray(windows, dtype=np.int64))
+            return [pd.Series(mean, index=values.index) for mean in means]
+        return [values.rolling(window=window).mean() for window in windows]
+
+    def calculate_stds(self, values: pd.Series, windows: list) -> list:
+        """Расчет скользящего стандартного отклонения для нескольких окон"""
+        if fast_ops.HAS_NUMBA:
+            stds = fast_ops.rolling_stds(values.to_numpy(dtype=np.float64), np.asarray(windows, dtype=np.int64))
+            return [pd.Series(std, index=values.index) for std in stds]
+        return [values.rolling(window=window).std() for window in windows]
+
+    def calculate_skew_kurt(self, values: pd.Series, window: int) -> tuple:
+        """Расчет скользящих асимметрии и эксцесса"""
+        if fast_ops.HAS_NUMBA:
+            skew, kurt = fast_ops.rolling_skew_kurt(values.to_numpy(dtype=np.float64), window)
+            return pd.Series(skew, index=values.index), pd.Series(kurt, index=values.index)
+        rolling = values.rolling(window=window)
+        return rolling.skew(), rolling.kurt()
+
+    def calculate_ema(self, prices: pd.Series, span: int) -> pd.Series:
+        """Расчет EMA"""
+        if fast_ops.HAS_NUMBA:
+            return pd.Series(fast_ops.ema(prices.to_numpy(dtype=np.float64), span), index=prices.index)
+        return prices.ewm(span=span).mean()
+
     def calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Расчет RSI"""
+        if fast_ops.HAS_NUMBA:
+            return pd.Series(fast_ops.rsi(prices.to_numpy(dtype=np.float64), period), index=prices.index)
+
         delta = prices.diff()
         gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
         loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
@@ -127,22 +166,30 @@ class FeatureEngineer:
 
     def calculate_macd(self, prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> tuple:
         """Расчет MACD"""
-        ema_fast = prices.ewm(span=fast).mean()
-        ema_slow = prices.ewm(span=slow).mean()
+        ema_fast = self.calculate_ema(prices, fast)
+        ema_slow = self.calculate_ema(prices, slow)
         macd = ema_fast - ema_slow
-        macd_signal = macd.ewm(span=signal).mean()
+        macd_signal = self.calculate_ema(macd, signal)
         return macd, macd_signal
 
-    def calculate_bollinger_bands(self, prices: pd.Series, window: int = 20, num_std: int = 2) -> tuple:
-        """Расчет Bollinger Bands"""
-        rolling_mean = prices.rolling(window=window).mean()
-        rolling_std = prices.rolling(window=window).std()
+    def calculate_bollinger_bands(self, prices: pd.Series, window: int = 20, num_std: int = 2,
+                                  rolling_mean: Optional[pd.Series] = None) -> tuple:
+        """Расчет Bollinger Bands (rolling_mean - уже посчитанная SMA того же окна)"""
+        if rolling_mean is None:
+            rolling_mean = prices.rolling(window=window).mean()
+        rolling_std = self.calculate_stds(prices, [window])[0]
         upper_band = rolling_mean + (rolling_std * num_std)
         lower_band = rolling_mean - (rolling_std * num_std)
         return upper_band, lower_band, rolling_mean
 
     def calculate_atr(self, df: pd.DataFrame, window: int = 14) -> pd.Series:
         """Расчет Average True Range"""
+        if fast_ops.HAS_NUMBA:
+            return pd.Series(fast_ops.atr(df['high'].to_numpy(dtype=np.float64),
+                                          df['low'].to_numpy(dtype=np.float64),
+                                          df['close'].to_numpy(dtype=np.float64), window),
+                             index=df.index)
+
         high_low = df['high'] - df['low']
         high_close = np.abs(df['high'] - df['close'].shift())
         low_close = np.abs(df['low'] - df['close'].shift())
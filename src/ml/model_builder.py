@@ -1,13 +1,13 @@
 import joblib
 import os
+import traceback
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from sklearn.ensemble import GradientBoostingClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
 import warnings
 
+from utils.config import load_config, save_config
+
 warnings.filterwarnings('ignore')
 
 
@@ -16,9 +16,11 @@ def train_model(symbol=None):
     Обучение модели для конкретного символа
     """
     try:
-        from src.utils.config import load_config
-        from src.core.mt5_client import load_data
-        from src.ml.feature_engineer import create_features
+        from sklearn.ensemble import GradientBoostingClassifier
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import accuracy_score, classification_report
+        from core.mt5_client import load_data
+        from ml.feature_engineer import create_features
 
         config = load_config()
 
@@ -34,7 +36,9 @@ def train_model(symbol=None):
         data = load_data(
             symbol=trading_symbol,
             timeframe_str=config['data']['timeframe'],
-            bars_count=config['data']['bars_count']
+            bars_count=config['data']['bars_count'],
+            float32=config['data'].get('downcast_float32', False),
+            disk_cache=config['data'].get('disk_cache', False)
         )
 
         if data.empty:
@@ -107,20 +111,21 @@ def train_model(symbol=None):
         os.makedirs('models', exist_ok=True)
 
         # Сохранение модели с именем включающим символ и дату
-        model_filename = f"model_{trading_symbol}_{datetime.now().strftime('%Y%m%d_%H%M')}.pkl"
+        # (одна отметка времени для имени файла и last_trained)
+        trained_at = datetime.now()
+        model_filename = f"model_{trading_symbol}_{trained_at.strftime('%Y%m%d_%H%M')}.pkl"
         model_path = os.path.join('models', model_filename)
 
         joblib.dump(model, model_path)
 
         # Сохраняем информацию о последней модели в конфиг
-        config['model']['last_trained'] = datetime.now().isoformat()
+        config['model']['last_trained'] = trained_at.isoformat()
         config['model']['current_model'] = model_path
         config['model']['symbol'] = trading_symbol
         config['model']['accuracy'] = float(accuracy)
         config['model']['features_count'] = int(X.shape[1])
         config['model']['training_samples'] = int(len(X))
 
-        from src.utils.config import save_config
         save_config(config)
 
         print(f"✅ Модель сохранена: {model_path}")
@@ -130,7 +135,6 @@ def train_model(symbol=None):
 
     except Exception as e:
         print(f"❌ Ошибка при обучении модели: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -162,7 +166,6 @@ def load_model_for_symbol(symbol):
         model = joblib.load(model_path)
 
         # Получаем информацию о модели
-        from src.utils.config import load_config
         config = load_config()
 
         model_info = {
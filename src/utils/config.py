@@ -61,7 +61,9 @@ def apply_defaults(config):
         'data': {
             'timeframe': 'M15',
             'bars_count': 2000,
-            'train_test_split': 0.8
+            'train_test_split': 0.8,
+            'downcast_float32': False,
+            'disk_cache': False
         },
         'symbol_specific': {}
     }
@@ -1,7 +1,8 @@
-import pandas as pd
-import numpy as np
 from typing import Dict, Optional
-import MetaTrader5 as mt5
+
+# Значение mt5.ORDER_TYPE_BUY: модулю нужна только эта константа,
+# поэтому MetaTrader5 (и его DLL) здесь не импортируется
+ORDER_TYPE_BUY = 0
 
 
 class RiskManager:
@@ -46,7 +47,7 @@ class RiskManager:
         """Расчет стоп-лосса с безопасными расстояниями"""
         # Увеличиваем расстояние для избежания ошибки 10030
         # Используем 50 пунктов для EURUSD (0.0050)
-        if order_type == mt5.ORDER_TYPE_BUY:
+        if order_type == ORDER_TYPE_BUY:
             # Для BUY: стоп-лосс ниже цены открытия
             stop_loss = price - 0.0050
         else:
@@ -58,7 +59,7 @@ class RiskManager:
     def calculate_take_profit(self, symbol: str, order_type: int, price: float) -> float:
         """Расчет тейк-профита с безопасными расстояниями"""
         # Используем 80 пунктов для EURUSD (0.0080)
-        if order_type == mt5.ORDER_TYPE_BUY:
+        if order_type == ORDER_TYPE_BUY:
             # Для BUY: тейк-профит выше цены открытия
             take_profit = price + 0.0080
         else:
@@ -4,9 +4,11 @@ Symbol Selector for AI Trading Robot
 Интерактивный выбор валютных пар и автоматическое обучение
 """
 
+import argparse
 import sys
 import os
 import time
+import traceback
 from datetime import datetime
 
 # Добавляем путь к корневой директории проекта
@@ -282,7 +284,6 @@ class SymbolSelector:
 
         except Exception as e:
             print(f"\n💥 Критическая ошибка при обучении: {e}")
-            import traceback
             traceback.print_exc()
             return False
 
@@ -320,8 +321,6 @@ def main():
     """
     Основная функция для выбора символа и автоматического обучения
     """
-    import argparse
-
     parser = argparse.ArgumentParser(description='Symbol Selector for AI Trading Robot')
     parser.add_argument('--no-train', action='store_true', help='Skip auto training after selection')
 
@@ -95,8 +95,8 @@ def check_available_data():
             print(f"  ✅ Доступен: {symbol_info.name}")
             print(f"  💰 Bid: {symbol_info.bid}, Ask: {symbol_info.ask}")
 
-            # Пробуем загрузить небольшое количество данных
-            rates = mt5.copy_rates_from(symbol, mt5.TIMEFRAME_M15, datetime.now(), 10)
+            # Пробуем загрузить последние бары тем же способом, что и load_data
+            rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M15, 0, 10)
             if rates is not None and len(rates) > 0:
                 print(f"  📊 Данные доступны: {len(rates)} баров")
             else:
@@ -106,8 +106,6 @@ def check_available_data():
 
 
 if __name__ == "__main__":
-    from datetime import datetime
-
     print("🤖 AI Trading Robot - Тестирование загрузки данных")
 
     # Тестируем загрузку данных
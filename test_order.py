@@ -13,7 +13,8 @@ if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
 try:
-    from core.mt5_client import initialize_mt5, place_order, get_symbol_info, close_all_orders
+    from core.mt5_client import initialize_mt5, place_order, get_symbol_info, close_all_orders, \
+        get_available_symbols, get_all_symbols, wait_for_positions
     from utils.config import load_config
 except ImportError as e:
     print(f"❌ Ошибка импорта: {e}")
@@ -64,9 +65,9 @@ def test_order(symbol=None):
     else:
         print("❌ Ошибка размещения BUY ордера")
 
-    # Небольшая пауза
-    import time
-    time.sleep(2)
+    # Ждем появления позиции перед следующим ордером
+    if success_buy:
+        wait_for_positions(test_symbol, 1)
 
     # Тестируем SELL ордер
     print(f"\n📉 Тестируем SELL ордер...")
@@ -110,8 +111,6 @@ def test_market_info():
     if not initialize_mt5():
         return False
 
-    from core.mt5_client import get_available_symbols, get_all_symbols
-
     # Получаем списки символов
     major_pairs = get_available_symbols()
     all_symbols = get_all_symbols()
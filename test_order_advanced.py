@@ -5,7 +5,6 @@
 
 import sys
 import os
-import time
 
 # Добавляем путь к src
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -13,7 +12,8 @@ src_path = os.path.join(current_dir, 'src')
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
-from core.mt5_client import initialize_mt5, place_order, get_symbol_info, close_all_orders, get_error_description
+from core.mt5_client import initialize_mt5, place_order, get_symbol_info, close_all_orders, get_error_description, \
+    wait_for_positions
 from utils.config import load_config
 
 
@@ -61,7 +61,8 @@ def test_order_advanced(symbol=None):
         take_profit=0.0
     )
 
-    time.sleep(2)
+    # Ждем появления позиции перед следующим ордером
+    wait_for_positions(test_symbol, int(success1))
 
     # Тест 2: С умеренными SL/TP
     print(f"\n🔹 Тест 2: С умеренными SL/TP (50/75 пипсов)")
@@ -73,7 +74,7 @@ def test_order_advanced(symbol=None):
         take_profit=0.0075  # 75 пипсов
     )
 
-    time.sleep(2)
+    wait_for_positions(test_symbol, int(success1) + int(success2))
 
     # Тест 3: SELL ордер
     print(f"\n🔹 Тест 3: SELL ордер с SL/TP")